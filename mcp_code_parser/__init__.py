@@ -5,6 +5,7 @@ from mcp_code_parser.api import (
     is_language_available,
     parse_code,
     parse_file,
+    parse_files,
     supported_languages,
 )
 from mcp_code_parser.parsers.base import ParseResult
@@ -15,6 +16,7 @@ __all__ = [
     "ParseResult",
     "parse_code",
     "parse_file",
+    "parse_files",
     "supported_languages",
     "is_language_available",
 ]
\ No newline at end of file
@@ -1,6 +1,9 @@
 """High-level API for mcp-code-parser."""
 
-from typing import Dict, List, Optional, Type
+import asyncio
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type
 
 from mcp_code_parser.parsers.base import BaseParser, ParseResult
 from mcp_code_parser.parsers.tree_sitter import TreeSitterParser
@@ -49,7 +52,8 @@ class AgentTools:
         self, 
         content: str, 
         language: str,
-        parser_name: Optional[str] = None
+        parser_name: Optional[str] = None,
+        **options: Any
     ) -> ParseResult:
         """Parse code content.
         
@@ -57,18 +61,22 @@ class AgentTools:
             content: Source code to parse
             language: Programming language
             parser_name: Optional specific parser to use
+            **options: Parser options, e.g. format=False to skip building
+                ast_text, or session_id and edits for incremental
+                tree-sitter parsing
             
         Returns:
             ParseResult with AST representation
         """
         parser = self.get_parser(parser_name)
-        return await parser.parse(content, language)
+        return await parser.parse(content, language, **options)
     
     async def parse_file(
         self,
         file_path: str,
         language: Optional[str] = None,
-        parser_name: Optional[str] = None
+        parser_name: Optional[str] = None,
+        **options: Any
     ) -> ParseResult:
         """Parse code from file.
         
@@ -76,12 +84,40 @@ class AgentTools:
             file_path: Path to source file
             language: Optional language override
             parser_name: Optional specific parser to use
+            **options: Parser options, e.g. format=False to skip building ast_text
             
         Returns:
             ParseResult with AST representation
         """
         parser = self.get_parser(parser_name)
-        return await parser.parse_file(file_path, language)
+        return await parser.parse_file(file_path, language, **options)
+    
+    async def parse_files(
+        self,
+        file_paths: List[str],
+        language: Optional[str] = None,
+        parser_name: Optional[str] = None,
+        max_concurrency: Optional[int] = None
+    ) -> List[ParseResult]:
+        """Parse several files concurrently.
+        
+        Args:
+            file_paths: Paths to source files
+            language: Optional language override applied to every file
+            parser_name: Optional specific parser to use
+            max_concurrency: Maximum parses in flight (defaults to CPU count)
+            
+        Returns:
+            ParseResults in the same order as file_paths
+        """
+        parser = self.get_parser(parser_name)
+        semaphore = asyncio.Semaphore(max_concurrency or os.cpu_count() or 1)
+        
+        async def _parse_one(file_path: str) -> ParseResult:
+            async with semaphore:
+                return await parser.parse_file(file_path, language)
+        
+        return list(await asyncio.gather(*(_parse_one(path) for path in file_paths)))
     
     def supported_languages(self, parser_name: Optional[str] = None) -> List[str]:
         """Get list of supported languages."""
@@ -102,26 +138,42 @@ class AgentTools:
         return list(self._parsers.keys())
 
 
-# Convenience functions for direct usage
+@lru_cache(maxsize=1)
+def get_default_tools() -> AgentTools:
+    """Return the process-wide AgentTools instance shared by the servers."""
+    return AgentTools()
+
 
-_global_tools = AgentTools()
+# Convenience functions for direct usage. The shared AgentTools instance is
+# created on first call rather than at import.
 
 
-async def parse_code(content: str, language: str) -> ParseResult:
+async def parse_code(content: str, language: str, **options: Any) -> ParseResult:
     """Parse code content using default parser."""
-    return await _global_tools.parse_code(content, language)
+    return await get_default_tools().parse_code(content, language, **options)
 
 
-async def parse_file(file_path: str, language: Optional[str] = None) -> ParseResult:
+async def parse_file(file_path: str, language: Optional[str] = None, **options: Any) -> ParseResult:
     """Parse code from file using default parser."""
-    return await _global_tools.parse_file(file_path, language)
+    return await get_default_tools().parse_file(file_path, language, **options)
+
+
+async def parse_files(
+    file_paths: List[str],
+    language: Optional[str] = None,
+    max_concurrency: Optional[int] = None
+) -> List[ParseResult]:
+    """Parse several files concurrently using default parser."""
+    return await get_default_tools().parse_files(
+        file_paths, language, max_concurrency=max_concurrency
+    )
 
 
 def supported_languages() -> List[str]:
     """Get list of supported languages."""
-    return _global_tools.supported_languages()
+    return get_default_tools().supported_languages()
 
 
 async def is_language_available(language: str) -> bool:
     """Check if language is available."""
-    return await _global_tools.is_language_available(language)
\ No newline at end of file
+    return await get_default_tools().is_language_available(language)
\ No newline at end of file
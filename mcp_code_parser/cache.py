@@ -0,0 +1,199 @@
+"""In-process caches for parse results."""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from mcp_code_parser.utils import get_grammar_cache_dir, json_dumps, json_loads
+
+
+class LRUCache:
+    """Bounded in-memory mapping that evicts the least recently used entry.
+
+    Recency is tracked with a plain dict's insertion order (oldest first),
+    which uses less memory than an OrderedDict. All operations, including
+    updates of ``total_bytes``, hold a lock, so one cache can be shared by
+    the HTTP server's worker threads and its byte budget stays exact.
+    """
+
+    def __init__(self, max_size: int = 512, max_bytes: Optional[int] = None):
+        """Create an empty cache.
+
+        Args:
+            max_size: Maximum number of entries
+            max_bytes: Optional bound on the total len() of the cached values,
+                for caches of bytes whose sizes vary widely
+        """
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, marking it as recently used."""
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._entries[key] = value
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            entries = self._entries
+            self._discard(key)
+            if self.max_bytes is not None:
+                size = len(value)
+                if size > self.max_bytes:
+                    # Would evict everything else and still not fit
+                    return
+                self.total_bytes += size
+            entries[key] = value
+            while len(entries) > self.max_size or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes
+            ):
+                self._discard(next(iter(entries)))
+
+    def _discard(self, key: Hashable) -> None:
+        """Remove an entry if present, keeping the byte total in sync.
+
+        Callers must hold the lock.
+        """
+        value = self._entries.pop(key, None)
+        if value is not None and self.max_bytes is not None:
+            self.total_bytes -= len(value)
+
+    def clear(self) -> int:
+        """Drop all entries and return how many were removed."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self.total_bytes = 0
+            return count
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FileParseCache(LRUCache):
+    """LRU cache of per-file values keyed by path, modification time and size.
+
+    Keys embed ``st_mtime_ns`` and ``st_size``, so an edited file produces a
+    new key and is re-parsed instead of being served from the cache.
+    """
+
+    def make_key(self, file_path: str, *extra: Hashable) -> Optional[Tuple[Hashable, ...]]:
+        """Build a cache key for a file, or None if it cannot be stat()ed."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, *extra)
+
+
+class DiskParseCache:
+    """Persistent cache of serialized parse results.
+
+    Entries live at ``<root>/<digest[:2]>/<digest[2:]>.<tags>.json`` where the
+    tags identify everything the result depends on besides the content
+    (language, grammar and package versions). Bumping ``CACHE_VERSION``
+    orphans all existing entries.
+
+    The directory holds at most ``max_entries`` entries. Hits refresh an
+    entry's modification time and every ``PRUNE_INTERVAL`` writes the least
+    recently used entries beyond the bound are deleted.
+    """
+
+    CACHE_VERSION = 2
+
+    # Environment variable that turns on the cache used by default parsers
+    ENV_VAR = "MCP_CODE_PARSER_DISK_CACHE"
+
+    # Number of writes between scans of the directory for entries to evict
+    PRUNE_INTERVAL = 64
+
+    def __init__(self, root: Optional[Path] = None, enabled: bool = True, max_entries: int = 10_000):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._root = root
+        self._puts = 0
+
+    @classmethod
+    def from_env(cls) -> "DiskParseCache":
+        """Create the default cache, enabled only if ``ENV_VAR`` is set to a true value."""
+        return cls(enabled=os.environ.get(cls.ENV_VAR, "").lower() in ("1", "true", "yes", "on"))
+
+    @property
+    def root(self) -> Path:
+        """Cache directory, defaulting to ``parse-cache`` under the grammar cache dir."""
+        if self._root is None:
+            self._root = get_grammar_cache_dir() / "parse-cache"
+        return self._root
+
+    def path_for(self, digest: str, *tags: str) -> Path:
+        """Return the entry path for a content digest and its dependency tags."""
+        name = ".".join((digest[2:], *tags, f"c{self.CACHE_VERSION}", "json"))
+        return self.root / digest[:2] / name
+
+    def get(self, digest: str, *tags: str) -> Optional[Dict[str, Any]]:
+        """Load a cached entry, or None if missing or unreadable."""
+        if not self.enabled:
+            return None
+        path = self.path_for(digest, *tags)
+        try:
+            with open(path, "rb") as f:
+                data = json_loads(f.read())
+            # Mark as recently used for prune()
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return data
+
+    def put(self, digest: str, *tags: str, data: Dict[str, Any]) -> None:
+        """Store an entry atomically; failures to write are ignored."""
+        if not self.enabled:
+            return
+        path = self.path_for(digest, *tags)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(json_dumps(data))
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            return
+        self._puts += 1
+        if self._puts % self.PRUNE_INTERVAL == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete the least recently used entries beyond ``max_entries``.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                entries.append((path.stat().st_mtime_ns, path))
+            except OSError:
+                continue
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return 0
+        entries.sort()
+        removed = 0
+        for _, path in entries[:excess]:
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
@@ -1,13 +1,36 @@
 """Command-line interface for mcp-code-parser."""
 
-import asyncio
-import json
+import os
 import sys
-from pathlib import Path
 
 import click
 
-from mcp_code_parser import parse_file, supported_languages
+from mcp_code_parser import parse_file, parse_files, supported_languages
+from mcp_code_parser.utils import json_dumps, run_async
+
+
+def _write_output(path: str, data: bytes) -> None:
+    """Write bytes to a file through a raw descriptor, bypassing Python's buffered I/O."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def _result_record(file_path: str, result) -> dict:
+    """Build the JSON output record for one parsed file."""
+    return {
+        "file": file_path,
+        "language": result.language,
+        "success": result.success,
+        "ast": result.ast_text,
+        "metadata": result.metadata,
+        "error": result.error,
+    }
 
 
 @click.group()
@@ -28,39 +51,57 @@ def parse(file_path: str, language: str, output: str, format: str):
         result = await parse_file(file_path, language)
         
         if format == "json":
-            data = {
-                "file": file_path,
-                "language": result.language,
-                "success": result.success,
-                "ast": result.ast_text,
-                "metadata": result.metadata,
-                "error": result.error,
-            }
-            output_text = json.dumps(data, indent=2)
+            output_bytes = json_dumps(_result_record(file_path, result), indent=True)
         else:
             if result.success:
-                output_text = f"Language: {result.language}\n"
-                output_text += f"File: {file_path}\n"
-                output_text += "-" * 40 + "\n"
-                output_text += result.ast_text
+                output_text = "".join((
+                    f"Language: {result.language}\n",
+                    f"File: {file_path}\n",
+                    "-" * 40,
+                    "\n",
+                    result.ast_text,
+                ))
             else:
                 output_text = f"Error parsing file: {result.error}"
+            output_bytes = output_text.encode("utf-8")
         
         if output:
-            Path(output).write_text(output_text)
+            _write_output(output, output_bytes)
             click.echo(f"Output written to: {output}")
         else:
-            click.echo(output_text)
+            click.echo(output_bytes)
     
-    asyncio.run(_parse())
+    run_async(_parse())
+
+
+@cli.command("parse-many")
+@click.argument("file_paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--language", "-l", help="Override language detection for every file")
+@click.option("--output", "-o", type=click.Path(), help="Output file (default: stdout)")
+@click.option("--concurrency", "-j", type=click.IntRange(min=0), default=None,
+              help="Maximum files parsed at once (default or 0: CPU count)")
+def parse_many(file_paths: tuple, language: str, output: str, concurrency: int):
+    """Parse several files in one process and output JSON lines, one per file."""
+    results = run_async(parse_files(list(file_paths), language, max_concurrency=concurrency))
+    output_bytes = b"".join(
+        json_dumps(_result_record(file_path, result)) + b"\n"
+        for file_path, result in zip(file_paths, results)
+    )
+    
+    if output:
+        _write_output(output, output_bytes)
+        click.echo(f"Output written to: {output}")
+    else:
+        click.echo(output_bytes, nl=False)
 
 
 @cli.command()
 def languages():
     """List supported programming languages."""
+    # The default parser reports languages already sorted
     langs = supported_languages()
     click.echo("Supported languages:")
-    for lang in sorted(langs):
+    for lang in langs:
         click.echo(f"  - {lang}")
 
 
@@ -71,15 +112,9 @@ def languages():
 @click.option("--log-dir", type=click.Path(), default="logs", help="Directory for log files")
 def serve(log_level: str, log_file: str, log_dir: str):
     """Start the MCP server (stdio transport)."""
-    import os
-    
-    # Set environment variables for logging before importing server
-    os.environ["AGENT_TOOLS_LOG_LEVEL"] = log_level
-    if log_file:
-        os.environ["AGENT_TOOLS_LOG_FILE"] = log_file
-    os.environ["AGENT_TOOLS_LOG_DIR"] = log_dir
+    from mcp_code_parser.mcp_server import configure_logging, run_stdio
     
-    from mcp_code_parser.mcp_server import run_stdio
+    configure_logging(log_level, log_file, log_dir)
     
     # MCP stdio mode - no echo to stdout (only stderr)
     import sys
@@ -1,10 +1,41 @@
 """Logging configuration for mcp-code-parser."""
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
+
+# Shared by every handler setup_logging creates
+_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Background writer for the log file set up by setup_logging
+_file_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """QueueListener that tracks whether it is running, so stop() can be repeated.
+    
+    Callers of start_queue_logging may stop the listener themselves before the
+    atexit hook runs; the base class fails when stopped twice.
+    """
+    
+    running = False
+    
+    def start(self) -> None:
+        super().start()
+        self.running = True
+    
+    def stop(self) -> None:
+        if self.running:
+            self.running = False
+            super().stop()
 
 
 def setup_logging(
@@ -25,18 +56,32 @@ def setup_logging(
     Returns:
         Configured logger instance
     """
+    # Skip record attributes the format never uses, including the caller's
+    # file, function and line, which need a stack walk per record. Only done
+    # here, by the process entry point, since these flags are global to logging.
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging.logAsyncioTasks = False
+    
+    global _file_listener
+    
     # Create logger
     logger = logging.getLogger("mcp_code_parser")
     logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
     
-    # Remove existing handlers
-    logger.handlers.clear()
+    # Remove existing handlers, releasing any open log files
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+    if _file_listener is not None:
+        _file_listener.stop()
+        for handler in _file_listener.handlers:
+            handler.close()
+        _file_listener = None
     
-    # Format for log messages
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    formatter = _FORMATTER
     
     # Add stderr handler (required for MCP - must use stderr not stdout)
     if log_to_stderr:
@@ -59,15 +104,57 @@ def setup_logging(
         file_handler = logging.FileHandler(file_path)
         file_handler.setFormatter(formatter)
         file_handler.setLevel(logging.DEBUG)  # File gets all levels
-        logger.addHandler(file_handler)
+        
+        # Disk writes happen on a listener thread; stderr stays synchronous
+        queue_handler, _file_listener = _start_listener([file_handler])
+        logger.addHandler(queue_handler)
         
         # Log the log file location (to stderr only)
         if log_to_stderr:
-            logger.info(f"Logging to file: {file_path}")
+            logger.info("Logging to file: %s", file_path)
     
     return logger
 
 
+def start_queue_logging(logger: Optional[logging.Logger] = None) -> Optional[logging.handlers.QueueListener]:
+    """
+    Move a logger's handlers onto a background thread.
+    
+    The logger's handlers are replaced by a single QueueHandler, so callers
+    only pay for enqueuing a record while a QueueListener thread does the
+    stream and file I/O. The listener is stopped (and the queue flushed) at exit.
+    
+    Args:
+        logger: Logger to convert (defaults to the package logger)
+        
+    Returns:
+        The started listener, or None if the logger has no handlers
+    """
+    logger = logger or logging.getLogger("mcp_code_parser")
+    queued = [
+        handler for handler in logger.handlers
+        if isinstance(handler, logging.handlers.QueueHandler)
+    ]
+    handlers = [handler for handler in logger.handlers if handler not in queued]
+    if not handlers:
+        return None
+    
+    queue_handler, listener = _start_listener(handlers)
+    logger.handlers = [*queued, queue_handler]
+    return listener
+
+
+def _start_listener(
+    handlers: List[logging.Handler],
+) -> Tuple[logging.handlers.QueueHandler, logging.handlers.QueueListener]:
+    """Start a listener thread feeding handlers, returning the handler that enqueues to it."""
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = _QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return logging.handlers.QueueHandler(log_queue), listener
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance for a specific module."""
     return logging.getLogger(f"mcp_code_parser.{name}")
\ No newline at end of file
@@ -1,71 +1,392 @@
 """Simple MCP server implementation for mcp-code-parser."""
 
+import asyncio
+import gzip
 import json
 import logging
-from datetime import datetime
+import os
+import threading
+import time
+from email.utils import formatdate
+from concurrent.futures import ThreadPoolExecutor
 from http.server import HTTPServer, BaseHTTPRequestHandler
-from typing import Any, Dict
-from urllib.parse import urlparse, parse_qs
+from typing import Any, Coroutine, Dict, Optional, Tuple
+from urllib.parse import parse_qs
 
-from mcp_code_parser.api import AgentTools
-from mcp_code_parser.parsers.languages import LANGUAGE_CONFIGS
+from mcp_code_parser.__version__ import __version__
+from mcp_code_parser.api import get_default_tools
+from mcp_code_parser.cache import FileParseCache
+from mcp_code_parser.logging import setup_logging, start_queue_logging
+from mcp_code_parser.parsers.languages import LANGUAGE_CONFIGS, SUPPORTED_LANGUAGES_SORTED
+from mcp_code_parser.utils import hash_content, json_dumps, json_loads, new_event_loop
+
+try:
+    import brotli
+except ImportError:  # optional speedup
+    brotli = None
 
 # Initialize tools
-tools = AgentTools()
+tools = get_default_tools()
 logger = logging.getLogger(__name__)
 
+# Serialized successful /parse-file responses, keyed by file path, mtime and size.
+# Bodies range from bytes to megabytes, so the cache is bounded by total size too.
+MAX_FILE_CACHE_BYTES = 64 * 1024 * 1024
+file_cache = FileParseCache(max_bytes=MAX_FILE_CACHE_BYTES)
+
+# /check-language responses for languages whose grammar is available. Misses are
+# not cached here: the parser memoizes failed grammar imports itself.
+_available_languages: Dict[str, Dict[str, Any]] = {}
+
+
+def _get_parser_info() -> str:
+    """Get parser information."""
+    return f"""Available parsers:
+- tree-sitter
+
+Supported languages:
+{', '.join(SUPPORTED_LANGUAGES_SORTED)}
+
+Total languages: {len(SUPPORTED_LANGUAGES_SORTED)}
+"""
+
+
+# Responses larger than this are streamed with chunked transfer encoding
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Request bodies larger than this are rejected with 413 before being read
+MAX_REQUEST_BYTES = 32 * 1024 * 1024
+# Bodies larger than this are read in chunks into one preallocated buffer
+STREAM_READ_THRESHOLD = 1024 * 1024
+
+# JSON bodies smaller than this are sent uncompressed; the framing overhead dominates
+COMPRESS_MIN_BYTES = 1024
+# Brotli only pays off over gzip for bodies beyond a few KB
+BROTLI_MIN_BYTES = 4096
+
+
+def _encoding_qvalues(header: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into a map of content coding to q-value.
+    
+    Codings without a q parameter get 1.0; an unparseable q-value counts as 0.
+    """
+    qvalues: Dict[str, float] = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+    return qvalues
+
+
+def _accepts_encoding(qvalues: Dict[str, float], coding: str) -> bool:
+    """Check whether a coding is acceptable under parsed Accept-Encoding q-values.
+    
+    A coding listed explicitly uses its own q-value, even when '*' is also
+    present; '*' only covers codings that are not listed.
+    """
+    q = qvalues.get(coding)
+    if q is None:
+        q = qvalues.get('*', 0.0)
+    return q > 0
+
+
+def _make_etag(body: bytes) -> str:
+    """Return a strong ETag for a response body."""
+    return f'"{hash_content(body)[:32]}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check whether an If-None-Match header matches an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+def _static_tail(body: bytes, content_type: str, etag: str) -> bytes:
+    """Return the header lines, blank line and body of a static response."""
+    headers = (
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"ETag: {etag}\r\n\r\n"
+    )
+    return headers.encode('latin-1') + body
+
+
+# Static response bodies, ETags and everything after the status line and
+# Date header, computed once at import
+_INFO_BYTES = _get_parser_info().encode('utf-8')
+_INFO_ETAG = _make_etag(_INFO_BYTES)
+_INFO_TAIL = _static_tail(_INFO_BYTES, 'text/plain; charset=utf-8', _INFO_ETAG)
+_LANGUAGES_BYTES = json_dumps(
+    {"languages": SUPPORTED_LANGUAGES_SORTED, "count": len(SUPPORTED_LANGUAGES_SORTED)}
+)
+_LANGUAGES_ETAG = _make_etag(_LANGUAGES_BYTES)
+_LANGUAGES_TAIL = _static_tail(_LANGUAGES_BYTES, 'application/json', _LANGUAGES_ETAG)
+
+_SERVER_HEADER = (
+    f"Server: {BaseHTTPRequestHandler.server_version} {BaseHTTPRequestHandler.sys_version}\r\n"
+).encode('latin-1')
+
+# (unix second, Date header line) - HTTP dates have one-second resolution
+_date_cache: Tuple[int, bytes] = (-1, b"")
+
+
+def _date_header() -> bytes:
+    """Return the Date header line, re-formatting it at most once per second."""
+    global _date_cache
+    second = time.time_ns() // 1_000_000_000
+    cached_second, line = _date_cache
+    if second != cached_second:
+        line = f"Date: {formatdate(second, usegmt=True)}\r\n".encode('latin-1')
+        _date_cache = (second, line)
+    return line
+
+
+_HEALTH_TEMPLATE = (
+    b'{"status": "healthy", "service": "mcp-code-parser", "timestamp": "{ts}", "version": "'
+    + __version__.encode('utf-8') + b'"}'
+)
+
+# (unix second, /health body) - the timestamp only changes once per second
+_health_cache: Tuple[int, bytes] = (-1, b"")
+
+
+def _health_body() -> bytes:
+    """Return the /health body, re-rendering the timestamp at most once per second."""
+    global _health_cache
+    second = time.time_ns() // 1_000_000_000
+    cached_second, body = _health_cache
+    if second != cached_second:
+        timestamp = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second)).encode('ascii')
+        body = _HEALTH_TEMPLATE.replace(b"{ts}", timestamp)
+        _health_cache = (second, body)
+    return body
+
+
+def _start_event_loop() -> asyncio.AbstractEventLoop:
+    """Start an event loop in a daemon thread for running parser coroutines."""
+    loop = new_event_loop()
+    
+    def _run_loop():
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+    
+    thread = threading.Thread(target=_run_loop, name="mcp-code-parser-loop", daemon=True)
+    thread.start()
+    return loop
+
+
+# Sent to connections that arrive while every worker is busy
+_BUSY_BODY = b'{"error": "Server busy, retry later"}'
+_BUSY_TAIL = (
+    "Content-Type: application/json\r\n"
+    f"Content-Length: {len(_BUSY_BODY)}\r\n"
+    "Retry-After: 1\r\n"
+    "Connection: close\r\n\r\n"
+).encode('latin-1') + _BUSY_BODY
+
+# How long a rejected connection may take to send its request head
+BUSY_READ_TIMEOUT = 0.5
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTP server that handles requests on a fixed pool of worker threads.
+    
+    Unlike ThreadingHTTPServer, which starts a thread per request, at most
+    max_workers connections are handled at once. Connections that arrive while
+    every worker is busy are answered with 503 by a single extra thread, so the
+    accept loop never blocks and shutdown() is not delayed.
+    """
+    
+    # Bursts of connections wait in the backlog until the accept loop reaches
+    # them; the default of 5 makes extra clients hit SYN retransmission delays
+    request_queue_size = 128
+    
+    def __init__(self, server_address, handler_class, max_workers: Optional[int] = None):
+        super().__init__(server_address, handler_class)
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="mcp-code-parser-http"
+        )
+        self._rejector = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mcp-code-parser-busy"
+        )
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+    
+    def process_request(self, request, client_address):
+        """Hand the connection to a free worker, or reject it with 503 if none is free."""
+        acquired = self._slots.acquire(blocking=False)
+        try:
+            if acquired:
+                self._executor.submit(self._process_request_worker, request, client_address)
+            else:
+                self._rejector.submit(self._reject_request_worker, request, client_address)
+        except BaseException:
+            if acquired:
+                self._slots.release()
+            self.shutdown_request(request)
+            raise
+    
+    def _process_request_worker(self, request, client_address):
+        """Handle one connection on a worker thread."""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+    
+    def _reject_request_worker(self, request, client_address):
+        """Answer a connection that arrived while every worker was busy with 503."""
+        logger.warning("All %d workers busy, rejecting %s", self.max_workers, client_address[0])
+        try:
+            # Consume the request head first: closing a socket with unread data
+            # resets the connection, which can discard the response
+            request.settimeout(BUSY_READ_TIMEOUT)
+            try:
+                request.recv(STREAM_CHUNK_SIZE)
+            except TimeoutError:
+                pass
+            request.sendall(
+                b"HTTP/1.1 503 Service Unavailable\r\n" + _SERVER_HEADER + _date_header() + _BUSY_TAIL
+            )
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+    
+    def server_close(self):
+        """Close the socket and wait for in-flight requests to finish."""
+        super().server_close()
+        self._rejector.shutdown(wait=True)
+        self._executor.shutdown(wait=True)
+
 
 class MCPHandler(BaseHTTPRequestHandler):
     """Simple HTTP handler for MCP-like interface."""
     
+    # Chunked transfer encoding requires HTTP/1.1
+    protocol_version = "HTTP/1.1"
+    
+    # Close idle keep-alive connections quickly so they do not pin pool workers
+    timeout = 5
+    
+    # Pretty-print JSON for the current request (?pretty=1)
+    pretty = False
+    
+    # Persistent event loop shared by all requests (set by run_server)
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _run(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Run a coroutine on the shared event loop and wait for its result."""
+        if self.loop is None:
+            return asyncio.run(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    def _route(self, routes: Dict[str, Any]) -> Any:
+        """Look up the handler for the request path and apply query options."""
+        path, _, query = self.path.partition('?')
+        # Only the pretty option is read from the query, so skip parsing when absent
+        self.pretty = bool(query) and parse_qs(query).get('pretty', [''])[-1] in ('1', 'true')
+        return routes.get(path)
+    
     def do_GET(self):
         """Handle GET requests."""
-        parsed_path = urlparse(self.path)
-        
-        if parsed_path.path == "/health":
-            self._send_json_response({
-                "status": "healthy",
-                "service": "mcp-code-parser",
-                "timestamp": datetime.utcnow().isoformat(),
-                "version": "0.1.0"
-            })
-        elif parsed_path.path == "/languages":
-            languages = list(LANGUAGE_CONFIGS.keys())
-            self._send_json_response({
-                "languages": sorted(languages),
-                "count": len(languages)
-            })
-        elif parsed_path.path == "/info":
-            self._send_text_response(self._get_parser_info())
-        else:
+        handler = self._route(self._GET_ROUTES)
+        if handler is None:
             self._send_error(404, "Not found")
+            return
+        handler(self)
     
     def do_POST(self):
         """Handle POST requests."""
-        parsed_path = urlparse(self.path)
+        handler = self._route(self._POST_ROUTES)
         
         # Read request body
-        content_length = int(self.headers.get('Content-Length', 0))
-        if content_length == 0:
-            self._send_error(400, "No request body")
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            content_length = -1
+        if content_length <= 0:
+            self.close_connection = True
+            self._send_error(400, "No request body" if content_length == 0 else "Invalid Content-Length")
+            return
+        if content_length > MAX_REQUEST_BYTES:
+            # The body is left unread, so the connection cannot be reused
+            self.close_connection = True
+            self._send_error(413, f"Request body exceeds {MAX_REQUEST_BYTES} bytes")
+            return
+        
+        body = self._read_body(content_length)
+        if body is None:
+            self.close_connection = True
+            self._send_error(400, "Incomplete request body")
             return
-            
+        
         try:
-            body = self.rfile.read(content_length)
-            data = json.loads(body.decode('utf-8'))
+            # Both parsers accept UTF-8 bytes directly, avoiding a decoded copy of the body
+            data = json_loads(body)
         except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError; the stdlib
+            # parser reports invalid UTF-8 as UnicodeDecodeError
             self._send_error(400, f"Invalid JSON: {str(e)}")
             return
         
-        # Route to appropriate handler
-        if parsed_path.path == "/parse":
-            self._handle_parse_code(data)
-        elif parsed_path.path == "/parse-file":
-            self._handle_parse_file(data)
-        elif parsed_path.path == "/check-language":
-            self._handle_check_language(data)
-        else:
+        if handler is None:
             self._send_error(404, "Not found")
+            return
+        handler(self, data)
+    
+    def _read_body(self, length: int) -> Optional[bytes]:
+        """Read exactly length body bytes, or return None if the client disconnects.
+        
+        Large bodies are read in chunks into a single preallocated buffer rather
+        than accumulated and joined, keeping peak memory close to the body size.
+        """
+        if length <= STREAM_READ_THRESHOLD:
+            body = self.rfile.read(length)
+            return body if len(body) == length else None
+        
+        buffer = bytearray(length)
+        view = memoryview(buffer)
+        received = 0
+        while received < length:
+            count = self.rfile.readinto(view[received:received + STREAM_CHUNK_SIZE])
+            if not count:
+                return None
+            received += count
+        view.release()
+        return buffer
+    
+    def _handle_health(self):
+        """Handle health check request."""
+        self._send_bytes(_health_body(), 'application/json')
+    
+    def _handle_languages(self):
+        """Handle supported languages request."""
+        if self.pretty:
+            self._send_json_bytes(_LANGUAGES_BYTES)
+        else:
+            self._send_static(_LANGUAGES_TAIL, _LANGUAGES_ETAG)
+    
+    def _handle_info(self):
+        """Handle parser information request."""
+        self._send_static(_INFO_TAIL, _INFO_ETAG)
     
     def _handle_parse_code(self, data: Dict[str, Any]):
         """Handle code parsing request."""
@@ -77,16 +398,9 @@ class MCPHandler(BaseHTTPRequestHandler):
             return
         
         # Parse the code
-        import asyncio
-        result = asyncio.run(tools.parse_code(content, language))
+        result = self._run(tools.parse_code(content, language))
         
-        self._send_json_response({
-            "success": result.success,
-            "language": result.language,
-            "ast": result.ast_text,
-            "metadata": result.metadata,
-            "error": result.error
-        })
+        self._send_json_response(result.to_dict(), stream=True)
     
     def _handle_parse_file(self, data: Dict[str, Any]):
         """Handle file parsing request."""
@@ -97,17 +411,41 @@ class MCPHandler(BaseHTTPRequestHandler):
             self._send_error(400, "Missing required field: file_path")
             return
         
+        cache_key = file_cache.make_key(file_path, language)
+        if cache_key is not None:
+            cached = file_cache.get(cache_key)
+            if cached is not None:
+                self._send_json_bytes(cached, stream=True)
+                return
+        
         # Parse the file
-        import asyncio
-        result = asyncio.run(tools.parse_file(file_path, language))
+        result = self._run(tools.parse_file(file_path, language))
+        
+        # Cache the serialized body so repeat requests skip JSON encoding
+        body = json_dumps(result.to_dict())
+        if cache_key is not None and result.success:
+            file_cache.put(cache_key, body)
+        self._send_json_bytes(body, stream=True)
+    
+    def _handle_parse_files(self, data: Dict[str, Any]):
+        """Handle batch file parsing request."""
+        file_paths = data.get('file_paths')
+        language = data.get('language')
+        
+        if not file_paths or not isinstance(file_paths, list):
+            self._send_error(400, "Missing required field: file_paths")
+            return
+        
+        # Parse the files concurrently
+        results = self._run(tools.parse_files(file_paths, language))
         
         self._send_json_response({
-            "success": result.success,
-            "language": result.language,
-            "ast": result.ast_text,
-            "metadata": result.metadata,
-            "error": result.error
-        })
+            "results": [
+                {"file_path": file_path, **result.to_dict()}
+                for file_path, result in zip(file_paths, results)
+            ],
+            "count": len(results)
+        }, stream=True)
     
     def _handle_check_language(self, data: Dict[str, Any]):
         """Handle language availability check."""
@@ -117,53 +455,131 @@ class MCPHandler(BaseHTTPRequestHandler):
             self._send_error(400, "Missing required field: language")
             return
         
+        cached = _available_languages.get(language)
+        if cached is not None:
+            self._send_json_response(cached)
+            return
+        
         supported = language in LANGUAGE_CONFIGS
         
         # Check if grammar is available
         if supported:
-            import asyncio
-            from mcp_code_parser.parsers.tree_sitter import TreeSitterParser
-            parser = TreeSitterParser()
-            grammar_available = asyncio.run(parser.is_language_available(language))
+            grammar_available = self._run(tools.is_language_available(language))
         else:
             grammar_available = False
         
-        self._send_json_response({
+        response = {
             "language": language,
             "supported": supported,
             "grammar_available": grammar_available,
             "message": f"Language {language} is {'supported' if supported else 'not supported'}"
-        })
+        }
+        if grammar_available:
+            _available_languages[language] = response
+        self._send_json_response(response)
     
-    def _get_parser_info(self) -> str:
-        """Get parser information."""
-        languages = sorted(LANGUAGE_CONFIGS.keys())
-        return f"""Available parsers:
-- tree-sitter
-
-Supported languages:
-{', '.join(languages)}
-
-Total languages: {len(languages)}
-"""
+    # Route tables, built once when the class is defined
+    _GET_ROUTES = {
+        "/health": _handle_health,
+        "/languages": _handle_languages,
+        "/info": _handle_info,
+    }
+    _POST_ROUTES = {
+        "/parse": _handle_parse_code,
+        "/parse-file": _handle_parse_file,
+        "/parse-files": _handle_parse_files,
+        "/check-language": _handle_check_language,
+    }
     
-    def _send_json_response(self, data: Any, status: int = 200):
-        """Send JSON response."""
-        response = json.dumps(data).encode('utf-8')
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Content-Length', str(len(response)))
-        self.end_headers()
-        self.wfile.write(response)
+    def _send_json_response(self, data: Any, status: int = 200, stream: bool = False):
+        """Send JSON response, streaming it in chunks if requested and large."""
+        self._write_json(json_dumps(data, indent=self.pretty), status, stream)
+    
+    def _send_json_bytes(self, body: bytes, status: int = 200, stream: bool = False):
+        """Send an already-serialized JSON body, chunked if requested and large."""
+        if self.pretty:
+            # Cached bodies are compact; re-indent only for interactive debugging
+            body = json_dumps(json_loads(body), indent=True)
+        self._write_json(body, status, stream)
+    
+    def _write_json(self, body: bytes, status: int, stream: bool):
+        """Write a JSON body, compressed if the client accepts it and chunked if requested and large."""
+        body, encoding = self._compress(body)
+        # HTTP/1.0 clients do not understand chunked transfer encoding
+        if stream and len(body) > STREAM_CHUNK_SIZE and self.request_version == "HTTP/1.1":
+            self._send_chunked(body, 'application/json', status, encoding)
+        else:
+            self._send_bytes(body, 'application/json', status, encoding)
+    
+    def _compress(self, body: bytes) -> Tuple[bytes, Optional[str]]:
+        """Compress a body per Accept-Encoding, returning it with its content coding."""
+        if len(body) < COMPRESS_MIN_BYTES:
+            return body, None
+        header = self.headers.get('Accept-Encoding')
+        if not header:
+            return body, None
+        qvalues = _encoding_qvalues(header)
+        if brotli is not None and len(body) > BROTLI_MIN_BYTES and _accepts_encoding(qvalues, 'br'):
+            return brotli.compress(body, quality=4), 'br'
+        if _accepts_encoding(qvalues, 'gzip'):
+            return gzip.compress(body, compresslevel=5), 'gzip'
+        return body, None
     
     def _send_text_response(self, text: str, status: int = 200):
         """Send text response."""
-        response = text.encode('utf-8')
+        self._send_bytes(text.encode('utf-8'), 'text/plain; charset=utf-8', status)
+    
+    def _response_head(self, status: int) -> bytes:
+        """Return the status line plus Server, Date and (when closing) Connection headers.
+        
+        Also logs the request.
+        """
+        self.log_request(status)
+        phrase = self.responses[status][0] if status in self.responses else ''
+        status_line = f"{self.protocol_version} {status} {phrase}\r\n".encode('latin-1')
+        head = status_line + _SERVER_HEADER + _date_header()
+        if self.close_connection:
+            # Tell keep-alive clients not to send another request on this connection
+            head += b"Connection: close\r\n"
+        return head
+    
+    def _send_bytes(self, body: bytes, content_type: str, status: int = 200,
+                    encoding: Optional[str] = None, etag: Optional[str] = None):
+        """Send an already-encoded response body with a single write."""
+        headers = f"Content-Type: {content_type}\r\n"
+        if etag:
+            headers += f"ETag: {etag}\r\n"
+        if encoding:
+            headers += f"Content-Encoding: {encoding}\r\nVary: Accept-Encoding\r\n"
+        headers += f"Content-Length: {len(body)}\r\n\r\n"
+        self.wfile.write(b"".join((self._response_head(status), headers.encode('latin-1'), body)))
+    
+    def _send_static(self, tail: bytes, etag: str):
+        """Send a precomputed static response, or 304 if the client's copy is current."""
+        if _etag_matches(self.headers.get('If-None-Match'), etag):
+            tail = f"ETag: {etag}\r\n\r\n".encode('latin-1')
+            self.wfile.write(self._response_head(304) + tail)
+            return
+        self.wfile.write(self._response_head(200) + tail)
+    
+    def _send_chunked(self, body: bytes, content_type: str, status: int = 200,
+                      encoding: Optional[str] = None):
+        """Send a response body using chunked transfer encoding."""
         self.send_response(status)
-        self.send_header('Content-Type', 'text/plain; charset=utf-8')
-        self.send_header('Content-Length', str(len(response)))
+        self.send_header('Content-Type', content_type)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+            self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Transfer-Encoding', 'chunked')
         self.end_headers()
-        self.wfile.write(response)
+        
+        view = memoryview(body)
+        for start in range(0, len(view), STREAM_CHUNK_SIZE):
+            chunk = view[start:start + STREAM_CHUNK_SIZE]
+            self.wfile.write(b"".join((b"%x\r\n" % len(chunk), chunk, b"\r\n")))
+        self.wfile.write(b"0\r\n\r\n")
     
     def _send_error(self, status: int, message: str):
         """Send error response."""
@@ -171,12 +587,25 @@ Total languages: {len(languages)}
     
     def log_message(self, format, *args):
         """Override to use logger instead of stderr."""
-        logger.info(format % args)
+        # Pass args through so the message is only formatted if the record is emitted
+        logger.info(format, *args)
 
 
-def run_server(host: str = "0.0.0.0", port: int = 8000):
-    """Run the MCP server."""
-    server = HTTPServer((host, port), MCPHandler)
+def run_server(host: str = "0.0.0.0", port: int = 8000, max_workers: Optional[int] = None,
+               log_level: str = "INFO"):
+    """Run the MCP server.
+    
+    Args:
+        host: Interface to bind to
+        port: Port to bind to
+        max_workers: Request handler threads (defaults to min(32, CPU count + 4))
+        log_level: Logging level for the stderr request log
+    """
+    setup_logging(log_level)
+    # Request threads only enqueue log records; handler I/O runs on a listener thread
+    start_queue_logging()
+    MCPHandler.loop = _start_event_loop()
+    server = PooledHTTPServer((host, port), MCPHandler, max_workers)
     print(f"Starting mcp-code-parser MCP server on http://{host}:{port}")
     print("Available endpoints:")
     print("  GET  /health          - Health check")
@@ -184,6 +613,7 @@ def run_server(host: str = "0.0.0.0", port: int = 8000):
     print("  GET  /info           - Parser information")
     print("  POST /parse          - Parse code (content, language)")
     print("  POST /parse-file     - Parse file (file_path, language?)")
+    print("  POST /parse-files    - Parse files concurrently (file_paths, language?)")
     print("  POST /check-language - Check language support (language)")
     print("\nPress Ctrl+C to stop")
     
@@ -192,6 +622,9 @@ def run_server(host: str = "0.0.0.0", port: int = 8000):
     except KeyboardInterrupt:
         print("\nShutting down...")
         server.shutdown()
+    finally:
+        server.server_close()
+        MCPHandler.loop.call_soon_threadsafe(MCPHandler.loop.stop)
 
 
 def main():
@@ -201,6 +634,7 @@ def main():
     parser = argparse.ArgumentParser(description="Agent Tools MCP Server")
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
+    parser.add_argument("--workers", type=int, default=None, help="Request handler threads")
     
     args = parser.parse_args()
-    run_server(args.host, args.port)
\ No newline at end of file
+    run_server(args.host, args.port, args.workers)
\ No newline at end of file
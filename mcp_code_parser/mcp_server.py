@@ -1,20 +1,25 @@
 """MCP server implementation for mcp-code-parser."""
 
-import os
-from typing import Optional
+import functools
+import inspect
+import logging
+from typing import Any, Callable, Dict, List, Optional
 
 from mcp.server.fastmcp import FastMCP
 
+from . import is_language_available
 from . import parse_code as parse_code_func
 from . import parse_file as parse_file_func
-from . import supported_languages
+from . import parse_files as parse_files_func
+from mcp_code_parser.cache import FileParseCache
 from mcp_code_parser.logging import setup_logging, get_logger
+from mcp_code_parser.parsers.languages import SUPPORTED_LANGUAGES_SORTED
+from mcp_code_parser.utils import json_dumps, run_async
 
-# Set up logging
-log_level = os.getenv("AGENT_TOOLS_LOG_LEVEL", "INFO")
-log_file = os.getenv("AGENT_TOOLS_LOG_FILE")
-log_dir = os.getenv("AGENT_TOOLS_LOG_DIR", "logs")
-logger = setup_logging(log_level, log_file, log_dir)
+# Logging is configured explicitly by the caller (see configure_logging)
+logger: Optional[logging.Logger] = None
+log_level = "INFO"
+log_dir: Optional[str] = "logs"
 mcp_logger = get_logger("mcp.server")
 
 # Create MCP server
@@ -25,35 +30,77 @@ mcp = FastMCP(
 )
 
 
+
+def _json_result(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Serialize a tool's dict result to a JSON string before FastMCP sees it.
+    
+    FastMCP passes str results through as text content, but converts anything
+    else with pydantic_core.to_jsonable_python followed by stdlib json.dumps.
+    The wrapper is annotated to return str, so FastMCP versions that derive an
+    output schema from the return annotation validate against the right type.
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return json_dumps(await func(*args, **kwargs)).decode('utf-8')
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return json_dumps(func(*args, **kwargs)).decode('utf-8')
+    
+    # wraps() shares func's annotations dict, and inspect.signature() would
+    # follow __wrapped__ back to the dict return type
+    wrapper.__annotations__ = {**func.__annotations__, "return": str}
+    wrapper.__signature__ = inspect.signature(func).replace(return_annotation=str)
+    return wrapper
+
+
+# Successful parse_file responses, keyed by file path, mtime and size
+_file_cache = FileParseCache()
+
+# check_language responses for languages whose grammar is available. Misses are
+# not cached here: the parser memoizes failed grammar imports itself.
+_available_languages: Dict[str, dict] = {}
+
+
 @mcp.tool()
-async def parse_code(content: str, language: str) -> dict:
+@_json_result
+async def parse_code(
+    content: str,
+    language: str,
+    session_id: Optional[str] = None,
+    edits: Optional[List[dict]] = None,
+) -> dict:
     """Parse source code and return AST representation.
     
     Args:
         content: Source code content to parse
         language: Programming language (python, javascript, typescript, go, cpp)
+        session_id: Optional session identifier; repeated calls with the same
+            session reuse the previous tree for incremental re-parsing
+        edits: Edits since the previous call in this session, each with
+            start_byte, old_end_byte, new_end_byte, start_point,
+            old_end_point and new_end_point ([row, column] pairs)
         
     Returns:
         Dictionary with parsing results including AST
     """
-    mcp_logger.debug(f"parse_code called with language={language}, content_length={len(content)}")
+    mcp_logger.debug("parse_code called with language=%s, content_length=%d", language, len(content))
     
-    result = await parse_code_func(content, language)
+    if session_id is not None:
+        result = await parse_code_func(content, language, session_id=session_id, edits=edits)
+    else:
+        result = await parse_code_func(content, language)
     
-    mcp_logger.debug(f"parse_code result: success={result.success}, ast_length={len(result.ast_text) if result.ast_text else 0}")
+    mcp_logger.debug("parse_code result: success=%s, ast_length=%d", result.success, len(result.ast_text or ""))
     if result.error:
-        mcp_logger.warning(f"parse_code error: {result.error}")
+        mcp_logger.warning("parse_code error: %s", result.error)
     
-    return {
-        "success": result.success,
-        "language": result.language,
-        "ast": result.ast_text,
-        "metadata": result.metadata,
-        "error": result.error
-    }
+    return result.to_dict()
 
 
 @mcp.tool()
+@_json_result
 async def parse_file(file_path: str, language: Optional[str] = None) -> dict:
     """Parse source code from a file and return AST representation.
     
@@ -64,24 +111,58 @@ async def parse_file(file_path: str, language: Optional[str] = None) -> dict:
     Returns:
         Dictionary with parsing results including AST
     """
-    mcp_logger.debug(f"parse_file called with file_path={file_path}, language={language}")
+    mcp_logger.debug("parse_file called with file_path=%s, language=%s", file_path, language)
+    
+    cache_key = _file_cache.make_key(file_path, language)
+    if cache_key is not None:
+        cached = _file_cache.get(cache_key)
+        if cached is not None:
+            mcp_logger.debug("parse_file cache hit for %s", file_path)
+            return cached
     
     result = await parse_file_func(file_path, language)
     
-    mcp_logger.debug(f"parse_file result: success={result.success}, detected_language={result.language}")
+    mcp_logger.debug("parse_file result: success=%s, detected_language=%s", result.success, result.language)
     if result.error:
-        mcp_logger.warning(f"parse_file error: {result.error}")
+        mcp_logger.warning("parse_file error: %s", result.error)
+    
+    response = result.to_dict()
+    if cache_key is not None and result.success:
+        _file_cache.put(cache_key, response)
+    return response
+
+
+@mcp.tool()
+@_json_result
+async def parse_files(file_paths: List[str], language: Optional[str] = None) -> dict:
+    """Parse several source files concurrently and return their AST representations.
+    
+    Args:
+        file_paths: Paths to the source code files
+        language: Optional language override applied to every file
+        
+    Returns:
+        Dictionary with per-file parsing results in input order
+    """
+    mcp_logger.debug("parse_files called with %d files, language=%s", len(file_paths), language)
+    
+    results = await parse_files_func(file_paths, language)
+    
+    failures = sum(1 for result in results if result.error)
+    if failures:
+        mcp_logger.warning("parse_files: %d of %d files failed", failures, len(results))
     
     return {
-        "success": result.success,
-        "language": result.language,
-        "ast": result.ast_text,
-        "metadata": result.metadata,
-        "error": result.error
+        "results": [
+            {"file_path": file_path, **result.to_dict()}
+            for file_path, result in zip(file_paths, results)
+        ],
+        "count": len(results)
     }
 
 
 @mcp.tool()
+@_json_result
 def list_languages() -> dict:
     """List all supported programming languages.
     
@@ -90,17 +171,16 @@ def list_languages() -> dict:
     """
     mcp_logger.debug("list_languages called")
     
-    languages = supported_languages()
-    
-    mcp_logger.debug(f"list_languages returning {len(languages)} languages")
+    mcp_logger.debug("list_languages returning %d languages", len(SUPPORTED_LANGUAGES_SORTED))
     
     return {
-        "languages": sorted(languages),
-        "count": len(languages)
+        "languages": SUPPORTED_LANGUAGES_SORTED,
+        "count": len(SUPPORTED_LANGUAGES_SORTED)
     }
 
 
 @mcp.tool()
+@_json_result
 async def check_language(language: str) -> dict:
     """Check if a language is supported and if its grammar is available.
     
@@ -110,37 +190,75 @@ async def check_language(language: str) -> dict:
     Returns:
         Dictionary with support status and availability
     """
-    mcp_logger.debug(f"check_language called with language={language}")
+    mcp_logger.debug("check_language called with language=%s", language)
     
-    from mcp_code_parser.api import AgentTools
-    from .parsers.tree_sitter import TreeSitterParser
+    cached = _available_languages.get(language)
+    if cached is not None:
+        return cached
     
-    tools = AgentTools()
-    languages = supported_languages()
-    
-    supported = language in languages
+    supported = language in SUPPORTED_LANGUAGES_SORTED
     
     if supported:
-        parser = TreeSitterParser()
-        grammar_available = await parser.is_language_available(language)
+        grammar_available = await is_language_available(language)
     else:
         grammar_available = False
     
-    mcp_logger.debug(f"check_language result: supported={supported}, grammar_available={grammar_available}")
+    mcp_logger.debug("check_language result: supported=%s, grammar_available=%s", supported, grammar_available)
     
-    return {
+    response = {
         "language": language,
         "supported": supported,
         "grammar_available": grammar_available,
         "message": f"Language {language} is {'supported' if supported else 'not supported'}"
     }
+    if grammar_available:
+        _available_languages[language] = response
+    return response
+
+
+@mcp.tool()
+@_json_result
+def clear_cache() -> dict:
+    """Clear cached parse_file results.
+    
+    Returns:
+        Dictionary with the number of cache entries removed
+    """
+    cleared = _file_cache.clear()
+    mcp_logger.debug("clear_cache removed %d entries", cleared)
+    return {"cleared": cleared}
+
+
+def configure_logging(
+    level: str = "INFO",
+    file: Optional[str] = None,
+    dir: Optional[str] = "logs"
+) -> logging.Logger:
+    """Configure server logging.
+    
+    Args:
+        level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        file: Specific log file path (overrides dir)
+        dir: Directory for timestamped log files
+        
+    Returns:
+        Configured package logger
+    """
+    global logger, log_level, log_dir
+    log_level = level
+    log_dir = dir
+    logger = setup_logging(level, file, dir)
+    return logger
 
 
 def run_stdio():
     """Run MCP server with stdio transport."""
+    if logger is None:
+        configure_logging()
     mcp_logger.info("Starting MCP server in stdio mode")
-    mcp_logger.info(f"Log level: {log_level}, Log directory: {log_dir}")
-    # FastMCP handles all the stdio setup internally
-    mcp.run(transport="stdio")
+    mcp_logger.info("Log level: %s, Log directory: %s", log_level, log_dir)
+    # FastMCP handles all the stdio setup internally; mcp.run() would use
+    # anyio's default asyncio loop, so drive it directly to allow uvloop
+    run_async(mcp.run_stdio_async())
 
 
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ParseResult:
     """Result of parsing operation."""
     
@@ -18,18 +18,34 @@ class ParseResult:
     def success(self) -> bool:
         """Check if parsing was successful."""
         return self.error is None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the JSON-serializable form used by the MCP and HTTP servers."""
+        return {
+            "success": self.error is None,
+            "language": self.language,
+            "ast": self.ast_text,
+            "metadata": self.metadata,
+            "error": self.error,
+        }
 
 
 class BaseParser(ABC):
-    """Abstract base class for code parsers."""
+    """Abstract base class for code parsers.
+    
+    Declares no instance attributes, so subclasses may define ``__slots__``.
+    """
+    
+    __slots__ = ()
     
     @abstractmethod
-    async def parse(self, content: str, language: str) -> ParseResult:
+    async def parse(self, content: str, language: str, *, format: bool = True) -> ParseResult:
         """Parse code content and return AST representation.
         
         Args:
             content: Source code to parse
             language: Programming language identifier
+            format: Build the AST text; when False only metadata is returned
             
         Returns:
             ParseResult with AST text representation
@@ -37,12 +53,19 @@ class BaseParser(ABC):
         pass
     
     @abstractmethod
-    async def parse_file(self, file_path: str, language: Optional[str] = None) -> ParseResult:
+    async def parse_file(
+        self,
+        file_path: str,
+        language: Optional[str] = None,
+        *,
+        format: bool = True
+    ) -> ParseResult:
         """Parse code from file.
         
         Args:
             file_path: Path to source file
             language: Optional language override (auto-detect if None)
+            format: Build the AST text; when False only metadata is returned
             
         Returns:
             ParseResult with AST text representation
@@ -1,19 +1,32 @@
 """Language configuration for tree-sitter grammars."""
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LanguageConfig:
-    """Configuration for a programming language."""
+    """Configuration for a programming language.
+    
+    Configs are shared process-wide (and cached by get_language_config), so
+    they are immutable and hold tuples rather than lists.
+    """
     
     name: str
     grammar_url: str
     grammar_repo: str
-    node_types_to_include: Optional[List[str]] = None
-    node_types_to_exclude: Optional[List[str]] = None
-    file_extensions: Optional[List[str]] = None
+    node_types_to_include: Optional[Tuple[str, ...]] = None
+    node_types_to_exclude: Optional[Tuple[str, ...]] = None
+    file_extensions: Optional[Tuple[str, ...]] = None
+    # Node type filters as sets for O(1) membership tests, derived from the above
+    included_node_types: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    excluded_node_types: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Derive the node type sets (frozen, so bypass __setattr__)."""
+        object.__setattr__(self, "included_node_types", frozenset(self.node_types_to_include or ()))
+        object.__setattr__(self, "excluded_node_types", frozenset(self.node_types_to_exclude or ()))
     
     @property
     def repo_name(self) -> str:
@@ -27,7 +40,7 @@ LANGUAGE_CONFIGS: Dict[str, LanguageConfig] = {
         name="python",
         grammar_url="https://github.com/tree-sitter/tree-sitter-python",
         grammar_repo="tree-sitter/tree-sitter-python",
-        node_types_to_include=[
+        node_types_to_include=(
             "module", "class_definition", "function_definition",
             "decorated_definition", "if_statement", "for_statement",
             "while_statement", "try_statement", "with_statement",
@@ -35,15 +48,15 @@ LANGUAGE_CONFIGS: Dict[str, LanguageConfig] = {
             "call", "binary_operator", "unary_operator", "comparison_operator",
             "list", "dictionary", "tuple", "set", "list_comprehension",
             "dictionary_comprehension", "generator_expression",
-        ],
-        file_extensions=[".py", ".pyw"],
+        ),
+        file_extensions=(".py", ".pyw"),
     ),
     
     "javascript": LanguageConfig(
         name="javascript",
         grammar_url="https://github.com/tree-sitter/tree-sitter-javascript",
         grammar_repo="tree-sitter/tree-sitter-javascript",
-        node_types_to_include=[
+        node_types_to_include=(
             "program", "function_declaration", "function_expression",
             "arrow_function", "class_declaration", "method_definition",
             "if_statement", "for_statement", "while_statement",
@@ -51,15 +64,15 @@ LANGUAGE_CONFIGS: Dict[str, LanguageConfig] = {
             "variable_declaration", "assignment_expression", "call_expression",
             "member_expression", "array", "object", "template_string",
             "import_statement", "export_statement",
-        ],
-        file_extensions=[".js", ".jsx", ".mjs"],
+        ),
+        file_extensions=(".js", ".jsx", ".mjs"),
     ),
     
     "typescript": LanguageConfig(
         name="typescript",
         grammar_url="https://github.com/tree-sitter/tree-sitter-typescript",
         grammar_repo="tree-sitter/tree-sitter-typescript",
-        node_types_to_include=[
+        node_types_to_include=(
             "program", "function_declaration", "function_expression",
             "arrow_function", "class_declaration", "method_definition",
             "interface_declaration", "type_alias_declaration",
@@ -67,15 +80,15 @@ LANGUAGE_CONFIGS: Dict[str, LanguageConfig] = {
             "while_statement", "switch_statement", "try_statement",
             "variable_declaration", "assignment_expression", "call_expression",
             "type_annotation", "generic_type", "union_type", "intersection_type",
-        ],
-        file_extensions=[".ts", ".tsx"],
+        ),
+        file_extensions=(".ts", ".tsx"),
     ),
     
     "go": LanguageConfig(
         name="go",
         grammar_url="https://github.com/tree-sitter/tree-sitter-go",
         grammar_repo="tree-sitter/tree-sitter-go",
-        node_types_to_include=[
+        node_types_to_include=(
             "source_file", "package_clause", "import_declaration",
             "function_declaration", "method_declaration", "struct_type",
             "interface_type", "if_statement", "for_statement",
@@ -83,45 +96,58 @@ LANGUAGE_CONFIGS: Dict[str, LanguageConfig] = {
             "defer_statement", "var_declaration", "const_declaration",
             "assignment_statement", "call_expression", "selector_expression",
             "composite_literal", "func_literal",
-        ],
-        file_extensions=[".go"],
+        ),
+        file_extensions=(".go",),
     ),
     
     "cpp": LanguageConfig(
         name="cpp",
         grammar_url="https://github.com/tree-sitter/tree-sitter-cpp",
         grammar_repo="tree-sitter/tree-sitter-cpp",
-        node_types_to_include=[
+        node_types_to_include=(
             "translation_unit", "function_definition", "class_specifier",
             "struct_specifier", "namespace_definition", "template_declaration",
             "if_statement", "for_statement", "while_statement",
             "switch_statement", "try_statement", "declaration",
             "assignment_expression", "call_expression", "field_expression",
             "lambda_expression", "new_expression", "delete_expression",
-        ],
-        file_extensions=[".cpp", ".cc", ".cxx", ".hpp", ".h", ".hxx"],
+        ),
+        file_extensions=(".cpp", ".cc", ".cxx", ".hpp", ".h", ".hxx"),
     ),
 }
 
 
+# Language names in sorted order; LANGUAGE_CONFIGS does not change at runtime
+SUPPORTED_LANGUAGES_SORTED: Tuple[str, ...] = tuple(sorted(LANGUAGE_CONFIGS))
+
+
+def _build_extension_index() -> Dict[str, str]:
+    """Map each file extension to the first language that lists it."""
+    index: Dict[str, str] = {}
+    for lang, config in LANGUAGE_CONFIGS.items():
+        for ext in config.file_extensions or ():
+            index.setdefault(ext, lang)
+    return index
+
+
+_EXT_INDEX = _build_extension_index()
+
+
+@lru_cache(maxsize=64)
 def get_language_config(language: str) -> Optional[LanguageConfig]:
     """Get configuration for a language."""
     return LANGUAGE_CONFIGS.get(language.lower())
 
 
-def get_supported_languages() -> List[str]:
-    """Get list of supported languages."""
-    return list(LANGUAGE_CONFIGS.keys())
+def get_supported_languages() -> Tuple[str, ...]:
+    """Get supported language names, sorted (immutable, so safe to share)."""
+    return SUPPORTED_LANGUAGES_SORTED
 
 
+@lru_cache(maxsize=64)
 def get_language_by_extension(file_extension: str) -> Optional[str]:
     """Get language name by file extension."""
     ext = file_extension.lower()
     if not ext.startswith("."):
         ext = f".{ext}"
-    
-    for lang, config in LANGUAGE_CONFIGS.items():
-        if config.file_extensions and ext in config.file_extensions:
-            return lang
-    
-    return None
\ No newline at end of file
+    return _EXT_INDEX.get(ext)
\ No newline at end of file
@@ -2,45 +2,224 @@
 
 import asyncio
 import importlib
+import importlib.metadata
+import importlib.util
 import logging
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, List, Optional
+from types import ModuleType
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
 
 import tree_sitter
 
+from mcp_code_parser.__version__ import __version__
+from mcp_code_parser.cache import DiskParseCache, LRUCache
 from mcp_code_parser.parsers.base import BaseParser, ParseResult
 from mcp_code_parser.parsers.languages import get_language_config, get_supported_languages
-from mcp_code_parser.utils import safe_read_file, detect_language_from_file
+from mcp_code_parser.utils import safe_read_file, detect_language_from_file, hash_content
 from mcp_code_parser.logging import get_logger
 
 # Set up logger for this module
 logger = get_logger("parsers.tree_sitter")
 
-# Pre-load language modules to ensure they're available in subprocesses
-_preloaded_modules = {}
 
-def _init_preloaded_modules():
-    """Initialize preloaded modules - called on first use."""
-    if _preloaded_modules:  # Already initialized
-        return
+@lru_cache(maxsize=None)
+def _import_grammar(module_name: str) -> Optional[ModuleType]:
+    """Import a grammar package on first use, or return None if it is not installed.
+    
+    Both outcomes are memoized: installed grammars do not change while the
+    process runs, and retrying a missing import would rescan sys.path each time.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        logger.error(f"Import error details: {e}")
+        logger.error(f"sys.path: {sys.path[:3]}")
+        return None
+
+
+# Thread pool for CPU-bound parsing, sized to the CPU count and created on first
+# use. Kept apart from the loop's default executor, which serves file reads.
+_parse_executor: Optional[ThreadPoolExecutor] = None
+_parse_executor_lock = threading.Lock()
+
+
+def _get_parse_executor() -> ThreadPoolExecutor:
+    """Return the shared parse thread pool, creating it on first use."""
+    global _parse_executor
+    if _parse_executor is None:
+        with _parse_executor_lock:
+            if _parse_executor is None:
+                _parse_executor = ThreadPoolExecutor(
+                    max_workers=os.cpu_count() or 1,
+                    thread_name_prefix="mcp-code-parser-parse",
+                )
+    return _parse_executor
+
+
+# Map language names to grammar package names
+_PACKAGE_MAP = {
+    "python": "tree-sitter-python",
+    "javascript": "tree-sitter-javascript",
+    "typescript": "tree-sitter-typescript",
+    "go": "tree-sitter-go",
+    "cpp": "tree-sitter-cpp",
+}
+
+
+@lru_cache(maxsize=1)
+def _installed_grammars() -> FrozenSet[str]:
+    """Return the languages whose grammar package is installed.
+    
+    Uses find_spec, which locates a package without executing it, and is
+    computed once: installed grammars do not change while the process runs.
+    """
+    return frozenset(
+        language
+        for language, package_name in _PACKAGE_MAP.items()
+        if importlib.util.find_spec(package_name.replace("-", "_")) is not None
+    )
+
+
+# Leaf text is shown escaped and truncated to 50 characters. Each character is at
+# most 4 UTF-8 bytes, so decoding this many bytes always yields enough characters
+# to render the same (truncated) text as decoding the whole leaf.
+_LEAF_PREFIX_BYTES = 51 * 4
+
+
+# Indentation strings for the first levels of the formatted AST
+_INDENT_DEPTHS = 128
+_INDENTS = tuple("  " * depth for depth in range(_INDENT_DEPTHS))
+
+
+# Per-language AST formatters, specialized on first use
+_formatters: Dict[str, Callable[[tree_sitter.Node, bytes], Tuple[str, int]]] = {}
+
+
+def _get_formatter(config) -> Callable[[tree_sitter.Node, bytes], Tuple[str, int]]:
+    """Return the AST formatter specialized for a language's node filter."""
+    formatter = _formatters.get(config.name)
+    if formatter is None:
+        if config.included_node_types:
+            formatter = _build_formatter(config.included_node_types, True)
+        else:
+            formatter = _build_formatter(config.excluded_node_types, False)
+        _formatters[config.name] = formatter
+    return formatter
+
+
+def _build_formatter(
+    node_types: FrozenSet[str],
+    expand_listed: bool,
+) -> Callable[[tree_sitter.Node, bytes], Tuple[str, int]]:
+    """Build an AST formatter with a language's node filter bound as constants.
+    
+    Args:
+        node_types: Node types from the language's include or exclude list
+        expand_listed: True if node_types lists the nodes whose children are
+            shown (include list), False if it lists nodes to collapse
         
-    for lang in ["python", "javascript", "typescript", "go"]:
-        try:
-            module_name = f"tree_sitter_{lang}"
-            _preloaded_modules[lang] = importlib.import_module(module_name)
-            logger.debug(f"Pre-loaded {module_name}")
-        except ImportError as e:
-            logger.debug(f"Could not pre-load {module_name}: {e}")
+    Returns:
+        Function mapping (root node, source bytes) to (AST text, node count)
+    """
+    def format_tree(node: tree_sitter.Node, source: bytes) -> Tuple[str, int]:
+        lines = []
+        # Bound once: the loop appends a line for every visible node
+        append = lines.append
+        # Leaf text is decoded straight from views of the source, without copying slices
+        view = memoryview(source)
+        cursor = node.walk()
+        depth = 0
+        count = 0
+        # Depth of the node whose children are filtered out, while walking below it
+        collapsed_at: Optional[int] = None
+        
+        while True:
+            count += 1
+            
+            if collapsed_at is None:
+                current = cursor.node
+                node_type = current.type
+                indent_str = _INDENTS[depth] if depth < _INDENT_DEPTHS else "  " * depth
+                
+                # Always show the node type
+                if current.child_count == 0:
+                    # Leaf node - include text
+                    start = current.start_byte
+                    end = min(current.end_byte, start + _LEAF_PREFIX_BYTES)
+                    text = str(view[start:end], "utf-8", "replace")
+                    # Escape newlines for display
+                    text = text.replace("\n", "\\n")
+                    if len(text) > 50:
+                        text = text[:47] + "..."
+                    append(f"{indent_str}{node_type}: {text!r}")
+                else:
+                    # Internal node
+                    append(f"{indent_str}{node_type}")
+                
+                # Collapse nodes missing from an include list or present in an exclude list
+                if (node_type in node_types) != expand_listed:
+                    collapsed_at = depth
+            
+            # Hidden subtrees are still walked so that every node is counted
+            if cursor.goto_first_child():
+                depth += 1
+                continue
+            
+            # Move to the next sibling, climbing back up as subtrees are exhausted
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return "\n".join(lines), count
+                depth -= 1
+            if collapsed_at is not None and depth <= collapsed_at:
+                collapsed_at = None
+    
+    return format_tree
+
+
+# Fields required to describe a single edit for incremental re-parsing
+_EDIT_FIELDS = (
+    "start_byte", "old_end_byte", "new_end_byte",
+    "start_point", "old_end_point", "new_end_point",
+)
 
 
 class TreeSitterParser(BaseParser):
     """Parser implementation using tree-sitter."""
     
-    def __init__(self):
-        """Initialize the tree-sitter parser."""
-        self.parsers: Dict[str, tree_sitter.Parser] = {}
+    # Maximum number of parse sessions whose trees are kept for incremental re-parsing
+    MAX_SESSIONS = 10
+    
+    # Maximum number of parse results kept in memory
+    RESULT_CACHE_SIZE = 256
+    
+    # Maximum number of idle tree-sitter parsers kept per language
+    PARSER_POOL_SIZE = 8
+    
+    def __init__(self, disk_cache: Optional[DiskParseCache] = None):
+        """Initialize the tree-sitter parser.
+        
+        Args:
+            disk_cache: Persistent result cache (defaults to one under the
+                grammar cache directory, enabled only when the
+                MCP_CODE_PARSER_DISK_CACHE environment variable is set)
+        """
+        # tree-sitter parsers are not reentrant, so concurrent parses each borrow one
+        self._parser_pools: Dict[str, List[tree_sitter.Parser]] = {}
         self._language_cache: Dict[str, tree_sitter.Language] = {}
+        self._grammar_versions: Dict[str, str] = {}
+        self._disk_cache = disk_cache if disk_cache is not None else DiskParseCache.from_env()
+        self._result_cache = LRUCache(self.RESULT_CACHE_SIZE)
+        # Insertion-ordered, least recently used session first
+        self._session_trees: Dict[str, Tuple[str, tree_sitter.Tree]] = {}
+        # Guards grammar loading when the parser is shared across threads
+        self._language_lock = threading.Lock()
     
     async def __aenter__(self):
         """Enter async context."""
@@ -56,20 +235,36 @@ class TreeSitterParser(BaseParser):
         return "tree-sitter"
     
     def supported_languages(self) -> List[str]:
-        """Get list of supported languages."""
-        return get_supported_languages()
+        """Get list of supported languages (a new list on each call)."""
+        return list(get_supported_languages())
     
     async def is_language_available(self, language: str) -> bool:
-        """Check if language grammar is available."""
-        try:
-            await self._get_or_install_language(language)
-            return True
-        except Exception:
-            return False
+        """Check if language grammar is available, without importing it."""
+        return language in self._language_cache or language in _installed_grammars()
     
-    async def parse(self, content: str, language: str) -> ParseResult:
-        """Parse source code and return AST."""
-        logger.debug(f"Starting parse for language={language}, content_length={len(content)}")
+    async def parse(
+        self,
+        content: str,
+        language: str,
+        *,
+        session_id: Optional[str] = None,
+        edits: Optional[List[Dict[str, Any]]] = None,
+        format: bool = True,
+    ) -> ParseResult:
+        """Parse source code and return AST.
+        
+        Args:
+            content: Source code to parse
+            language: Programming language identifier
+            session_id: Optional session whose previous tree is reused for
+                incremental re-parsing
+            edits: Edits applied since the previous parse in this session, each
+                with start_byte, old_end_byte, new_end_byte, start_point,
+                old_end_point and new_end_point
+            format: Build ast_text; when False only metadata (node count) is
+                computed and ast_text is empty
+        """
+        logger.debug("Starting parse for language=%s, content_length=%d", language, len(content))
         
         try:
             # Get language configuration
@@ -83,11 +278,46 @@ class TreeSitterParser(BaseParser):
                     error=f"Language {language} not supported"
                 )
             
+            # Results are a pure function of the content and grammar, so unchanged
+            # content can skip tree-sitter entirely (sessions need the real tree)
+            # Encode once: the same bytes are hashed, parsed and sliced by the formatter
+            source_bytes = content.encode("utf-8")
+            
+            cache_tags: Optional[Tuple[str, ...]] = None
+            if session_id is None:
+                digest = hash_content(source_bytes)
+                result = self._result_cache.get((digest, language))
+                if result is None:
+                    cache_tags = self._cache_tags(language)
+                    cached = None
+                    if self._disk_cache.enabled:
+                        # File I/O and JSON decoding stay off the event loop
+                        cached = await asyncio.get_running_loop().run_in_executor(
+                            _get_parse_executor(), self._disk_cache.get, digest, *cache_tags
+                        )
+                    if cached is not None:
+                        logger.debug("Disk cache hit for %s content %.12s", language, digest)
+                        result = ParseResult(
+                            language=language,
+                            ast_text=cached["ast_text"],
+                            metadata=cached["metadata"],
+                            error=None
+                        )
+                        self._result_cache.put((digest, language), result)
+                if result is not None:
+                    # Hand out a copy so callers cannot alter what later hits return
+                    return ParseResult(
+                        language=language,
+                        ast_text=result.ast_text if format else "",
+                        metadata=dict(result.metadata),
+                        error=None
+                    )
+            
             # Get or install language
-            logger.debug(f"Getting or installing language grammar for {language}")
+            logger.debug("Getting or installing language grammar for %s", language)
             try:
                 lang = await self._get_or_install_language(language)
-                logger.debug(f"Successfully loaded language grammar for {language}")
+                logger.debug("Successfully loaded language grammar for %s", language)
             except Exception as e:
                 logger.error(f"Failed to load language grammar for {language}: {e}")
                 return ParseResult(
@@ -97,39 +327,44 @@ class TreeSitterParser(BaseParser):
                     error=str(e)
                 )
             
-            # Get or create parser
-            if language not in self.parsers:
-                logger.debug(f"Creating new parser for {language}")
-                parser = tree_sitter.Parser(lang)
-                self.parsers[language] = parser
-            else:
-                logger.debug(f"Reusing existing parser for {language}")
-                parser = self.parsers[language]
+            # Parse the code, reusing the session's previous tree when edits are given
+            old_tree = self._get_session_tree(session_id, language, edits)
             
-            # Parse the code
-            logger.debug("Parsing code with tree-sitter")
-            tree = parser.parse(bytes(content, "utf8"))
-            logger.debug(f"Parse complete, root node type: {tree.root_node.type}")
+            # Parsing and formatting are CPU-bound; run them off the event loop
+            tree, ast_text, node_count = await asyncio.get_running_loop().run_in_executor(
+                _get_parse_executor(), self._parse_sync, source_bytes, language, lang, config, old_tree, format
+            )
             
-            # Format AST
-            logger.debug("Formatting AST")
-            ast_text = self._format_ast(tree.root_node, content, config)
-            logger.debug(f"AST formatted, length: {len(ast_text)}")
+            if session_id is not None:
+                self._store_session_tree(session_id, language, tree)
             
-            # Count nodes
-            node_count = self._count_nodes(tree.root_node)
-            logger.debug(f"Total node count: {node_count}")
+            metadata = {
+                "parser": self.name(),
+                "node_count": node_count,
+                "tree_sitter_version": str(tree_sitter.LANGUAGE_VERSION)
+            }
+            if session_id is not None:
+                metadata["incremental"] = old_tree is not None
             
-            return ParseResult(
+            result = ParseResult(
                 language=language,
                 ast_text=ast_text,
-                metadata={
-                    "parser": self.name(),
-                    "node_count": node_count,
-                    "tree_sitter_version": str(tree_sitter.LANGUAGE_VERSION)
-                },
+                metadata=metadata,
                 error=None
             )
+            # Caches only hold full results; metadata-only calls are derived from them
+            if cache_tags is not None and format:
+                # The caller owns the returned result; the cache keeps its own copy
+                self._result_cache.put((digest, language), replace(result, metadata=dict(metadata)))
+                if self._disk_cache.enabled:
+                    await asyncio.get_running_loop().run_in_executor(
+                        _get_parse_executor(),
+                        partial(
+                            self._disk_cache.put, digest, *cache_tags,
+                            data={"ast_text": ast_text, "metadata": metadata}
+                        )
+                    )
+            return result
             
         except Exception as e:
             logger.error(f"Unexpected error during parsing: {e}", exc_info=True)
@@ -140,11 +375,19 @@ class TreeSitterParser(BaseParser):
                 error=f"Failed to parse: {str(e)}"
             )
     
-    async def parse_file(self, file_path: str, language: Optional[str] = None) -> ParseResult:
+    async def parse_file(
+        self,
+        file_path: str,
+        language: Optional[str] = None,
+        *,
+        format: bool = True,
+    ) -> ParseResult:
         """Parse source file and return AST."""
-        # Read file
+        # Read file off the event loop so reads overlap with other parses
         try:
-            content = safe_read_file(file_path)
+            content = await asyncio.get_running_loop().run_in_executor(
+                None, safe_read_file, file_path
+            )
         except Exception as e:
             return ParseResult(
                 language=language or "unknown",
@@ -165,50 +408,143 @@ class TreeSitterParser(BaseParser):
                 )
         
         # Parse content
-        return await self.parse(content, language)
+        return await self.parse(content, language, format=format)
+    
+    def _parse_sync(
+        self,
+        source_bytes: bytes,
+        language: str,
+        lang: tree_sitter.Language,
+        config,
+        old_tree: Optional[tree_sitter.Tree],
+        format: bool = True,
+    ) -> Tuple[tree_sitter.Tree, str, int]:
+        """Parse and format code synchronously; runs in an executor thread.
+        
+        Returns:
+            Tuple of (tree, formatted AST text or "" if not formatting, node count)
+        """
+        logger.debug("Parsing code with tree-sitter")
+        with self._checkout_parser(language, lang) as parser:
+            if old_tree is not None:
+                tree = parser.parse(source_bytes, old_tree)
+            else:
+                tree = parser.parse(source_bytes)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Parse complete, root node type: %s", tree.root_node.type)
+        
+        if not format:
+            return tree, "", self._count_nodes(tree.root_node)
+        
+        # Format AST and count nodes in a single traversal
+        logger.debug("Formatting AST")
+        ast_text, node_count = self._format_ast(tree.root_node, source_bytes, config)
+        logger.debug("AST formatted, length: %d, node count: %d", len(ast_text), node_count)
+        return tree, ast_text, node_count
+    
+    @contextmanager
+    def _checkout_parser(self, language: str, lang: tree_sitter.Language) -> Iterator[tree_sitter.Parser]:
+        """Borrow an idle parser for a language, creating one if none is free."""
+        pool = self._parser_pools.setdefault(language, [])
+        try:
+            parser = pool.pop()
+        except IndexError:
+            logger.debug("Creating new parser for %s", language)
+            parser = tree_sitter.Parser(lang)
+        try:
+            yield parser
+        finally:
+            if len(pool) < self.PARSER_POOL_SIZE:
+                pool.append(parser)
+    
+    def _get_session_tree(
+        self,
+        session_id: Optional[str],
+        language: str,
+        edits: Optional[List[Dict[str, Any]]],
+    ) -> Optional[tree_sitter.Tree]:
+        """Return a copy of the session's previous tree with edits applied, if reusable.
+        
+        The stored tree is never modified, so a bad edit leaves the session
+        as it was; the edited copy replaces it only after a successful parse.
+        """
+        if session_id is None or not edits:
+            return None
+        
+        entry = self._session_trees.get(session_id)
+        if entry is None or entry[0] != language:
+            return None
+        
+        # Validate every edit before touching any tree
+        for edit in edits:
+            missing = [field for field in _EDIT_FIELDS if field not in edit]
+            if missing:
+                raise ValueError(f"Edit is missing fields: {', '.join(missing)}")
+        
+        tree = entry[1].copy()
+        for edit in edits:
+            tree.edit(
+                start_byte=edit["start_byte"],
+                old_end_byte=edit["old_end_byte"],
+                new_end_byte=edit["new_end_byte"],
+                start_point=tuple(edit["start_point"]),
+                old_end_point=tuple(edit["old_end_point"]),
+                new_end_point=tuple(edit["new_end_point"]),
+            )
+        logger.debug("Reusing tree from session %s with %d edits", session_id, len(edits))
+        return tree
+    
+    def _store_session_tree(self, session_id: str, language: str, tree: tree_sitter.Tree) -> None:
+        """Remember a session's latest tree, evicting the least recently used session."""
+        sessions = self._session_trees
+        sessions.pop(session_id, None)
+        sessions[session_id] = (language, tree)
+        while len(sessions) > self.MAX_SESSIONS:
+            del sessions[next(iter(sessions))]
+    
+    def _cache_tags(self, language: str) -> Tuple[str, ...]:
+        """Tags identifying the grammar and package versions a cached result depends on."""
+        grammar_version = self._grammar_versions.get(language)
+        if grammar_version is None:
+            try:
+                grammar_version = importlib.metadata.version(_PACKAGE_MAP[language])
+            except (KeyError, importlib.metadata.PackageNotFoundError):
+                grammar_version = "unknown"
+            self._grammar_versions[language] = grammar_version
+        return (
+            language,
+            f"ts{tree_sitter.LANGUAGE_VERSION}",
+            f"g{grammar_version}",
+            f"v{__version__}",
+        )
     
     async def _get_or_install_language(self, language: str) -> tree_sitter.Language:
         """Get language object, installing if necessary."""
-        # Initialize preloaded modules on first use
-        _init_preloaded_modules()
-        
         # Check cache first
         if language in self._language_cache:
             return self._language_cache[language]
         
-        # Map language names to package names
-        package_map = {
-            "python": "tree-sitter-python",
-            "javascript": "tree-sitter-javascript", 
-            "typescript": "tree-sitter-typescript",
-            "go": "tree-sitter-go",
-            "cpp": "tree-sitter-cpp",
-        }
-        
-        package_name = package_map.get(language)
+        with self._language_lock:
+            # Another thread may have loaded it while we waited
+            if language in self._language_cache:
+                return self._language_cache[language]
+            return self._load_language(language)
+    
+    def _load_language(self, language: str) -> tree_sitter.Language:
+        """Import the grammar package for a language and cache its Language object."""
+        package_name = _PACKAGE_MAP.get(language)
         if not package_name:
             raise ValueError(f"No package mapping for language: {language}")
         
         # Try to import the language module
         module_name = package_name.replace("-", "_")
         
-        # First check if we have it pre-loaded
-        if language in _preloaded_modules:
-            module = _preloaded_modules[language]
-            logger.debug(f"Using pre-loaded module for {language}")
-        else:
-            try:
-                # Try to import existing module
-                module = importlib.import_module(module_name)
-            except ImportError as e:
-                # Log more details about the import error
-                logger.error(f"Import error details: {e}")
-                logger.error(f"sys.path: {sys.path[:3]}")
-                logger.error(f"Module name: {module_name}")
-                raise RuntimeError(
-                    f"Language package {package_name} not installed. "
-                    f"Install it with: uv add {package_name} or uv sync --extra languages"
-                )
+        module = _import_grammar(module_name)
+        if module is None:
+            raise RuntimeError(
+                f"Language package {package_name} not installed. "
+                f"Install it with: uv add {package_name} or uv sync --extra languages"
+            )
         
         # Get the language object
         # Most tree-sitter language packages expose a language() function that returns a capsule
@@ -227,50 +563,25 @@ class TreeSitterParser(BaseParser):
         return lang
     
     
-    def _format_ast(self, node: tree_sitter.Node, source: str, config) -> str:
-        """Format AST node as text."""
-        lines = []
-        self._format_node(node, source, 0, lines, config)
-        return "\n".join(lines)
-    
-    def _format_node(self, node: tree_sitter.Node, source: str, indent: int, lines: List[str], config) -> None:
-        """Recursively format AST node."""
-        # Format current node
-        indent_str = "  " * indent
-        
-        if logger.isEnabledFor(logging.DEBUG) and indent == 0:
-            logger.debug(f"Formatting root AST node type: {node.type}")
+    def _format_ast(self, node: tree_sitter.Node, source: bytes, config) -> Tuple[str, int]:
+        """Format AST node as text and count every node in one cursor walk.
         
-        # Always show the node type
-        if node.child_count == 0:
-            # Leaf node - include text
-            text = source[node.start_byte:node.end_byte]
-            # Escape newlines for display
-            text = text.replace("\n", "\\n")
-            if len(text) > 50:
-                text = text[:47] + "..."
-            lines.append(f"{indent_str}{node.type}: {repr(text)}")
-        else:
-            # Internal node
-            lines.append(f"{indent_str}{node.type}")
-        
-        # Traverse children if not filtered
-        if config.node_types_to_include:
-            # If we have an include list, only show children for included nodes
-            if node.type in config.node_types_to_include:
-                for child in node.children:
-                    self._format_node(child, source, indent + 1, lines, config)
-        elif config.node_types_to_exclude and node.type in config.node_types_to_exclude:
-            # Skip children of excluded nodes
-            return
-        else:
-            # No filtering, show all children
-            for child in node.children:
-                self._format_node(child, source, indent + 1, lines, config)
+        Returns:
+            Tuple of (formatted AST text, total node count including hidden nodes)
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Formatting root AST node type: %s", node.type)
+        return _get_formatter(config)(node, source)
     
     def _count_nodes(self, node: tree_sitter.Node) -> int:
-        """Count total nodes in AST."""
-        count = 1
-        for child in node.children:
-            count += self._count_nodes(child)
-        return count
\ No newline at end of file
+        """Count total nodes in AST without formatting them."""
+        count = 0
+        cursor = node.walk()
+        
+        while True:
+            count += 1
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return count
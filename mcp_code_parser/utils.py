@@ -1,9 +1,42 @@
 """Common utilities for mcp-code-parser."""
 
+import asyncio
 import hashlib
+import json
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Any, Coroutine, Optional, TypeVar, Union
+
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # not installed, or on Windows where it is unavailable
+    uvloop = None
+
+T = TypeVar("T")
+
+
+def run_async(main: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion on a new event loop, using uvloop if installed."""
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop, using uvloop if installed."""
+    if uvloop is not None:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
 
 
 def get_cache_dir() -> Path:
@@ -20,44 +53,114 @@ def get_grammar_cache_dir() -> Path:
     return grammar_dir
 
 
+# File extension (lowercase, with dot) to language name
+_EXT_TO_LANG = {
+    ".py": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".go": "go",
+    ".c": "c",
+    ".cc": "cpp",
+    ".cpp": "cpp",
+    ".cxx": "cpp",
+    ".h": "c",
+    ".hpp": "cpp",
+    ".hxx": "cpp",
+}
+
+
 def detect_language_from_file(file_path: str) -> Optional[str]:
     """Detect programming language from file extension."""
-    ext_to_lang = {
-        ".py": "python",
-        ".js": "javascript",
-        ".jsx": "javascript",
-        ".ts": "typescript",
-        ".tsx": "typescript",
-        ".go": "go",
-        ".c": "c",
-        ".cc": "cpp",
-        ".cpp": "cpp",
-        ".cxx": "cpp",
-        ".h": "c",
-        ".hpp": "cpp",
-        ".hxx": "cpp",
-    }
+    return _EXT_TO_LANG.get(os.path.splitext(file_path)[1].lower())
+
+
+def hash_content(content: Union[str, bytes]) -> str:
+    """Generate hash of content for caching.
     
-    ext = Path(file_path).suffix.lower()
-    return ext_to_lang.get(ext)
+    Uses BLAKE3 when the ``blake3`` package is installed, otherwise SHA-256.
+    Both produce 64 hex characters.
+    """
+    data = content.encode() if isinstance(content, str) else content
+    if blake3 is not None:
+        return blake3(data).hexdigest()
+    return hashlib.sha256(data).hexdigest()
 
 
-def hash_content(content: str) -> str:
-    """Generate hash of content for caching."""
-    return hashlib.sha256(content.encode()).hexdigest()
+def json_dumps(data: Any, indent: bool = False) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, using orjson when installed.
+    
+    Args:
+        data: JSON-serializable object
+        indent: Pretty-print with two-space indentation
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(data, indent=2 if indent else None).encode("utf-8")
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str, using orjson when installed.
+    
+    Raises:
+        json.JSONDecodeError: Invalid JSON (orjson's error subclasses it)
+        UnicodeDecodeError: Invalid UTF-8 input to the stdlib parser
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Files larger than this get a sequential readahead hint before being read
+_FADVISE_MIN_BYTES = 1024 * 1024
+
+
+def _read_bytes(file_path: str) -> bytes:
+    """Read a whole file through a raw descriptor, sized by fstat().
+    
+    Skips Python's buffered I/O layer: a regular file is read with one
+    os.read() call of exactly its size.
+    """
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size > _FADVISE_MIN_BYTES and hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        data = os.read(fd, size) if size else b""
+        if len(data) < size or not size:
+            # Short read, or a file whose size stat() does not report (e.g. /proc)
+            parts = [data]
+            while chunk := os.read(fd, 1024 * 1024):
+                parts.append(chunk)
+            data = b"".join(parts)
+        return data
+    finally:
+        os.close(fd)
 
 
 def safe_read_file(file_path: str, encoding: str = "utf-8") -> str:
-    """Safely read file content."""
+    """Safely read file content.
+    
+    The file is read once in binary mode and decoded in memory, retrying
+    fallback encodings without reopening it. Line endings are normalized
+    as in text mode.
+    """
+    raw = _read_bytes(file_path)
+    
     try:
-        with open(file_path, "r", encoding=encoding) as f:
-            return f.read()
+        text = raw.decode(encoding)
     except UnicodeDecodeError:
         # Try with different encodings
-        for enc in ["latin-1", "ascii", "utf-16"]:
+        for enc in ("latin-1", "ascii", "utf-16"):
             try:
-                with open(file_path, "r", encoding=enc) as f:
-                    return f.read()
+                text = raw.decode(enc)
+                break
             except UnicodeDecodeError:
                 continue
-        raise
\ No newline at end of file
+        else:
+            raise
+    
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
@@ -1,21 +1,54 @@
 """Pytest configuration and fixtures."""
 
 import asyncio
-import tempfile
+import os
 from pathlib import Path
-from typing import Generator
+from typing import Dict
 
 import pytest
 
+from mcp_code_parser.api import AgentTools, get_default_tools
+from mcp_code_parser.cache import DiskParseCache
 
-@pytest.fixture
-def temp_dir() -> Generator[Path, None, None]:
-    """Create temporary directory."""
-    with tempfile.TemporaryDirectory() as td:
-        yield Path(td)
+# Tests must parse for real, not read results persisted by an earlier run
+os.environ.pop(DiskParseCache.ENV_VAR, None)
 
 
-@pytest.fixture
-def tmp_path(temp_dir):
-    """Alias for temp_dir for compatibility."""
-    return temp_dir
\ No newline at end of file
+def pytest_collection_modifyitems(items):
+    """Mark tests that start the HTTP server subprocess (via mcp_server) as slow."""
+    for item in items:
+        if "mcp_server" in getattr(item, "fixturenames", ()):
+            item.add_marker(pytest.mark.slow)
+
+
+@pytest.fixture(scope="session")
+def samples_dir() -> Path:
+    """Get samples directory."""
+    return Path(__file__).parent / "samples"
+
+
+@pytest.fixture(scope="session")
+def sample_bytes(samples_dir: Path) -> Dict[str, bytes]:
+    """Contents of every sample file, read once per session and keyed by name."""
+    return {path.name: path.read_bytes() for path in samples_dir.iterdir() if path.is_file()}
+
+
+@pytest.fixture(scope="session")
+def agent_tools() -> AgentTools:
+    """Default AgentTools instance with every installed grammar loaded once.
+    
+    The convenience functions (parse_code, parse_file, ...) share this
+    instance, so tests using them skip first-use grammar loading too.
+    """
+    tools = get_default_tools()
+    
+    async def _warm():
+        languages = [
+            language for language in tools.supported_languages()
+            if await tools.is_language_available(language)
+        ]
+        # format=False parses are not cached, so warming leaves no results behind
+        await asyncio.gather(*(tools.parse_code("", language, format=False) for language in languages))
+    
+    asyncio.run(_warm())
+    return tools
@@ -1,14 +1,20 @@
 """Unit tests for AgentTools API."""
 
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 
-from mcp_code_parser.api import AgentTools
+from mcp_code_parser.api import AgentTools, get_default_tools
 from mcp_code_parser.parsers.base import BaseParser, ParseResult
 
 
 class MockParser(BaseParser):
     """Mock parser for testing."""
     
+    __slots__ = ("name", "parse_called", "parse_file_called")
+    
     def __init__(self, name: str = "mock"):
         self.name = name
         self.parse_called = False
@@ -40,13 +46,21 @@ class MockParser(BaseParser):
 @pytest.fixture
 def mcp_code_parser():
     """Create AgentTools instance without default parsers."""
-    tools = AgentTools()
-    # Clear default parsers for testing
-    tools._parsers.clear()
-    tools._default_parser = None
+    # Skip __init__ so no TreeSitterParser is built just to be discarded
+    tools = AgentTools.__new__(AgentTools)
+    tools._parsers, tools._default_parser = {}, None
     return tools
 
 
+def test_mock_parser_uses_slots():
+    """Test that BaseParser lets subclasses drop the per-instance __dict__."""
+    parser = MockParser()
+    
+    assert not hasattr(parser, "__dict__")
+    with pytest.raises(AttributeError):
+        parser.parse_caled = True
+
+
 def test_register_parser(mcp_code_parser):
     """Test registering custom parsers."""
     parser1 = MockParser("parser1")
@@ -100,7 +114,6 @@ def test_get_parser(mcp_code_parser):
         mcp_code_parser.get_parser()
 
 
-@pytest.mark.asyncio
 async def test_parse_code_with_specific_parser(mcp_code_parser):
     """Test parsing code with specific parser."""
     parser1 = MockParser("parser1")
@@ -117,7 +130,6 @@ async def test_parse_code_with_specific_parser(mcp_code_parser):
     assert result.metadata["parser"] == "parser2"
 
 
-@pytest.mark.asyncio
 async def test_parse_code_with_default_parser(mcp_code_parser):
     """Test parsing code with default parser."""
     parser = MockParser()
@@ -129,7 +141,6 @@ async def test_parse_code_with_default_parser(mcp_code_parser):
     assert result.success
 
 
-@pytest.mark.asyncio
 async def test_parse_file_with_language_override(mcp_code_parser):
     """Test parsing file with language override."""
     parser = MockParser()
@@ -142,6 +153,30 @@ async def test_parse_file_with_language_override(mcp_code_parser):
     assert result.metadata["file"] == "/test/file.txt"
 
 
+async def test_parse_file_forwards_format_option():
+    """Test that format=False reaches the default tree-sitter parser."""
+    code_file = Path(__file__).parent / "samples" / "python_complex.py"
+    
+    result = await AgentTools().parse_file(str(code_file), format=False)
+    
+    assert result.success
+    assert result.ast_text == ""
+    assert result.metadata["node_count"] > 0
+
+
+async def test_parse_files_preserves_order(mcp_code_parser):
+    """Test batch parsing returns one result per file in input order."""
+    parser = MockParser()
+    mcp_code_parser.register_parser("test", parser)
+    mcp_code_parser.set_default_parser("test")
+    
+    paths = [f"/test/file{i}.txt" for i in range(5)]
+    results = await mcp_code_parser.parse_files(paths, language="mock", max_concurrency=2)
+    
+    assert [r.metadata["file"] for r in results] == paths
+    assert all(r.language == "mock" for r in results)
+
+
 def test_list_parsers(mcp_code_parser):
     """Test listing registered parsers."""
     assert mcp_code_parser.list_parsers() == []
@@ -169,7 +204,6 @@ def test_supported_languages_delegation(mcp_code_parser):
     assert languages == ["mock", "test"]
 
 
-@pytest.mark.asyncio
 async def test_is_language_available_delegation(mcp_code_parser):
     """Test that is_language_available delegates to parser."""
     parser = MockParser()
@@ -192,9 +226,19 @@ def test_default_parser_initialization():
     languages = tools.supported_languages()
     assert "python" in languages
     assert "javascript" in languages
+    
+    # Listing languages reads the static config; no grammar is loaded
+    assert tools.get_parser()._language_cache == {}
+
+
+def test_get_default_tools_is_shared():
+    """Test that the default AgentTools instance is created once per process."""
+    tools = get_default_tools()
+    
+    assert isinstance(tools, AgentTools)
+    assert get_default_tools() is tools
 
 
-@pytest.mark.asyncio
 async def test_error_propagation(mcp_code_parser):
     """Test that parser errors are properly propagated."""
     class ErrorParser(MockParser):
@@ -212,4 +256,16 @@ async def test_error_propagation(mcp_code_parser):
     
     result = await mcp_code_parser.parse_code("test", "any")
     assert not result.success
-    assert result.error == "Test error"
\ No newline at end of file
+    assert result.error == "Test error"
+
+
+def test_import_does_not_create_default_tools():
+    """Test that importing the package does not construct AgentTools."""
+    code = (
+        "import mcp_code_parser\n"
+        "from mcp_code_parser.api import get_default_tools\n"
+        "print(get_default_tools.cache_info().currsize)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    
+    assert result.stdout.strip() == "0"
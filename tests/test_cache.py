@@ -0,0 +1,186 @@
+"""Unit tests for parse result caches."""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from mcp_code_parser.cache import DiskParseCache, FileParseCache, LRUCache
+
+
+def test_make_key_tracks_file_changes(tmp_path):
+    """Test that editing a file changes its cache key."""
+    cache = FileParseCache()
+    source = tmp_path / "example.py"
+    source.write_text("x = 1")
+    
+    key = cache.make_key(str(source), "python")
+    assert key is not None
+    assert key == cache.make_key(str(source), "python")
+    
+    source.write_text("x = 12")
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.make_key(str(source), "python") != key
+
+
+def test_make_key_missing_file():
+    """Test that missing files produce no key."""
+    cache = FileParseCache()
+    assert cache.make_key("/nonexistent/file.py") is None
+
+
+def test_get_and_put():
+    """Test storing and retrieving values."""
+    cache = FileParseCache()
+    key = ("/a.py", 1, 10, None)
+    
+    assert cache.get(key) is None
+    cache.put(key, {"success": True})
+    assert cache.get(key) == {"success": True}
+    assert len(cache) == 1
+
+
+def test_lru_eviction():
+    """Test that least recently used entries are evicted first."""
+    cache = FileParseCache(max_size=2)
+    cache.put(("a",), 1)
+    cache.put(("b",), 2)
+    
+    # Touch "a" so "b" becomes least recently used
+    assert cache.get(("a",)) == 1
+    cache.put(("c",), 3)
+    
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == 1
+    assert cache.get(("c",)) == 3
+
+
+def test_clear():
+    """Test clearing the cache."""
+    cache = FileParseCache()
+    cache.put(("a",), 1)
+    cache.put(("b",), 2)
+    
+    assert cache.clear() == 2
+    assert len(cache) == 0
+    assert cache.get(("a",)) is None
+
+
+def test_concurrent_puts_and_gets():
+    """Test that worker threads can share one cache while it evicts."""
+    cache = LRUCache(max_size=8)
+    
+    def work(worker):
+        for i in range(10000):
+            cache.put((worker, i), i)
+            cache.get((worker, i - 1))
+    
+    # Switch threads often so unguarded evictions would interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            # result() re-raises any error from a worker
+            for future in [pool.submit(work, worker) for worker in range(8)]:
+                future.result()
+    finally:
+        sys.setswitchinterval(interval)
+    
+    assert len(cache) == 8
+
+
+def test_concurrent_byte_budget():
+    """Test that the byte total stays exact when threads put and evict at once."""
+    cache = LRUCache(max_size=1000, max_bytes=64)
+    
+    def work(worker):
+        for i in range(5000):
+            cache.put((worker, i % 50), b"x" * (i % 7 + 1))
+    
+    # Switch threads often so unguarded updates of total_bytes would be lost
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for future in [pool.submit(work, worker) for worker in range(8)]:
+                future.result()
+    finally:
+        sys.setswitchinterval(interval)
+    
+    assert cache.total_bytes == sum(len(value) for value in cache._entries.values())
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_disk_cache_round_trip(tmp_path):
+    """Test storing and loading entries on disk."""
+    cache = DiskParseCache(tmp_path)
+    data = {"ast_text": "module", "metadata": {"node_count": 1}}
+    
+    assert cache.get("abcdef", "python", "g1") is None
+    cache.put("abcdef", "python", "g1", data=data)
+    
+    assert cache.get("abcdef", "python", "g1") == data
+    assert cache.path_for("abcdef", "python", "g1").parent == tmp_path / "ab"
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_disk_cache_tags_invalidate(tmp_path):
+    """Test that entries written for another grammar version are not reused."""
+    cache = DiskParseCache(tmp_path)
+    cache.put("abcdef", "python", "g1", data={"ast_text": "module"})
+    
+    assert cache.get("abcdef", "python", "g2") is None
+    assert cache.get("abcdef", "javascript", "g1") is None
+
+
+def test_disk_cache_disabled(tmp_path):
+    """Test that a disabled cache neither reads nor writes."""
+    cache = DiskParseCache(tmp_path, enabled=False)
+    cache.put("abcdef", "python", data={"ast_text": "module"})
+    
+    assert cache.get("abcdef", "python") is None
+    assert not any(tmp_path.iterdir())
+
+
+def test_disk_cache_prunes_least_recently_used(tmp_path):
+    """Test that pruning keeps the most recently used entries."""
+    cache = DiskParseCache(tmp_path, max_entries=2)
+    for i, digest in enumerate(["aa01", "aa02", "aa03"]):
+        cache.put(digest, "python", data={"ast_text": digest})
+        os.utime(cache.path_for(digest, "python"), ns=(i, i))
+    # A hit refreshes the oldest entry
+    assert cache.get("aa01", "python") is not None
+    
+    assert cache.prune() == 1
+    assert cache.get("aa02", "python") is None
+    assert cache.get("aa01", "python") is not None
+    assert cache.get("aa03", "python") is not None
+
+
+def test_disk_cache_from_env(monkeypatch):
+    """Test that the default disk cache is opt-in."""
+    monkeypatch.delenv(DiskParseCache.ENV_VAR, raising=False)
+    assert DiskParseCache.from_env().enabled is False
+    
+    monkeypatch.setenv(DiskParseCache.ENV_VAR, "1")
+    assert DiskParseCache.from_env().enabled is True
+
+
+def test_byte_bounded_eviction():
+    """Test that a byte budget evicts old entries and rejects oversized ones."""
+    cache = LRUCache(max_size=100, max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"5678")
+    cache.put("c", b"90ab")
+    
+    assert cache.get("a") is None
+    assert cache.get("b") == b"5678"
+    assert cache.total_bytes == 8
+    
+    cache.put("huge", b"x" * 11)
+    assert cache.get("huge") is None
+    assert len(cache) == 2
+    
+    # Replacing an entry does not double count it
+    cache.put("b", b"56")
+    assert cache.total_bytes == 6
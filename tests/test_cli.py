@@ -1,10 +1,12 @@
 """Unit tests for CLI functionality."""
 
 import json
-import tempfile
+import sys
+import types
 from pathlib import Path
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import click
 import pytest
 from click.testing import CliRunner
 
@@ -12,15 +14,19 @@ from mcp_code_parser.cli import cli
 from mcp_code_parser.parsers.base import ParseResult
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def runner():
-    """Create Click test runner."""
-    return CliRunner()
+    """Create Click test runner shared by the tests in this module.
+    
+    Unexpected exceptions propagate with their traceback instead of being
+    stored on the result.
+    """
+    return CliRunner(catch_exceptions=False)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_parse_result():
-    """Create mock parse result."""
+    """Create mock parse result, shared read-only by the tests in this module."""
     return ParseResult(
         language="python",
         ast_text="module\n  function_definition: 'test'",
@@ -29,6 +35,34 @@ def mock_parse_result():
     )
 
 
+@pytest.fixture
+def mcp_server_stub(monkeypatch):
+    """Stand in for mcp_code_parser.mcp_server so serve skips the MCP SDK import."""
+    stub = types.ModuleType("mcp_code_parser.mcp_server")
+    stub.configure_logging = MagicMock()
+    stub.run_stdio = MagicMock()
+    monkeypatch.setitem(sys.modules, "mcp_code_parser.mcp_server", stub)
+    return stub
+
+
+@pytest.fixture(scope="module")
+def parse_cmd():
+    """The parse subcommand, invoked directly rather than through the cli group."""
+    return cli.commands["parse"]
+
+
+@pytest.fixture
+def patched_parse(request, monkeypatch, mock_parse_result):
+    """Replace the CLI's parse_file with an async mock.
+    
+    Returns mock_parse_result unless a ParseResult is supplied through
+    indirect parametrization.
+    """
+    mock_parse = AsyncMock(return_value=getattr(request, "param", mock_parse_result))
+    monkeypatch.setattr("mcp_code_parser.cli.parse_file", mock_parse)
+    return mock_parse
+
+
 def test_cli_help(runner):
     """Test CLI help command."""
     result = runner.invoke(cli, ["--help"])
@@ -53,173 +87,174 @@ def test_languages_command(runner):
         assert "- go" in result.output
 
 
-def test_parse_command_text_output(runner, mock_parse_result):
+def test_parse_command_text_output(parse_cmd, capsys, patched_parse, fs):
     """Test parse command with text output."""
-    with tempfile.NamedTemporaryFile(suffix=".py", delete=False) as f:
-        f.write(b"def test(): pass")
-        temp_file = f.name
-    
-    try:
-        # Need to patch the async function to return a coroutine
-        async def mock_coro(*args, **kwargs):
-            return mock_parse_result
-            
-        with patch("mcp_code_parser.cli.parse_file", new=mock_coro):
-            
-            result = runner.invoke(cli, ["parse", temp_file])
-            
-            assert result.exit_code == 0
-            assert "Language: python" in result.output
-            assert f"File: {temp_file}" in result.output
-            assert "module" in result.output
-            assert "function_definition: 'test'" in result.output
-            
-            # Note: Can't easily verify the call with the async mock
-    finally:
-        Path(temp_file).unlink()
-
-
-def test_parse_command_json_output(runner, mock_parse_result):
+    temp_file = "/src/test.py"
+    fs.create_file(temp_file, contents="def test(): pass")
+    
+    parse_cmd.main([temp_file], standalone_mode=False)
+    output = capsys.readouterr().out
+    
+    assert "Language: python" in output
+    assert f"File: {temp_file}" in output
+    assert "module" in output
+    assert "function_definition: 'test'" in output
+    patched_parse.assert_awaited_once_with(temp_file, None)
+
+
+def test_parse_command_json_output(parse_cmd, capsys, patched_parse, mock_parse_result, fs):
     """Test parse command with JSON output."""
-    with tempfile.NamedTemporaryFile(suffix=".js", delete=False) as f:
-        f.write(b"const x = 1;")
-        temp_file = f.name
-    
-    try:
-        async def mock_coro(*args, **kwargs):
-            return mock_parse_result
-            
-        with patch("mcp_code_parser.cli.parse_file", new=mock_coro):
-            result = runner.invoke(cli, ["parse", temp_file, "--format", "json"])
-            
-            assert result.exit_code == 0
-            
-            # Verify JSON output
-            output_data = json.loads(result.output)
-            assert output_data["file"] == temp_file
-            assert output_data["language"] == "python"
-            assert output_data["success"] is True
-            assert output_data["ast"] == mock_parse_result.ast_text
-            assert output_data["metadata"]["node_count"] == 5
-    finally:
-        Path(temp_file).unlink()
-
-
-def test_parse_command_with_language_override(runner, mock_parse_result):
+    temp_file = "/src/test.js"
+    fs.create_file(temp_file, contents="const x = 1;")
+    
+    parse_cmd.main([temp_file, "--format", "json"], standalone_mode=False)
+    output = capsys.readouterr().out
+    
+    # Verify JSON output
+    output_data = json.loads(output)
+    assert output_data["file"] == temp_file
+    assert output_data["language"] == "python"
+    assert output_data["success"] is True
+    assert output_data["ast"] == mock_parse_result.ast_text
+    assert output_data["metadata"]["node_count"] == 5
+
+
+def test_parse_command_with_language_override(parse_cmd, patched_parse, fs):
     """Test parse command with language override."""
-    with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
-        f.write(b"some code")
-        temp_file = f.name
-    
-    try:
-        async def mock_coro(*args, **kwargs):
-            return mock_parse_result
-            
-        with patch("mcp_code_parser.cli.parse_file", new=mock_coro):
-            
-            result = runner.invoke(cli, ["parse", temp_file, "--language", "python"])
-            
-            assert result.exit_code == 0
-            
-            # Verify language was passed
-            # Note: Cannot easily verify the call with the async mock
-    finally:
-        Path(temp_file).unlink()
-
-
-def test_parse_command_output_to_file(runner, mock_parse_result):
+    temp_file = "/src/code.txt"
+    fs.create_file(temp_file, contents="some code")
+    
+    parse_cmd.main([temp_file, "--language", "python"], standalone_mode=False)
+    
+    # Verify language was passed
+    patched_parse.assert_awaited_once_with(temp_file, "python")
+
+
+def test_parse_command_output_to_file(parse_cmd, capsys, patched_parse, mock_parse_result, fs):
     """Test parse command with output to file."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        input_file = Path(tmpdir) / "input.py"
-        output_file = Path(tmpdir) / "output.txt"
-        input_file.write_text("x = 1")
-        
-        async def mock_coro(*args, **kwargs):
-            return mock_parse_result
-            
-        with patch("mcp_code_parser.cli.parse_file", new=mock_coro):
-            
-            result = runner.invoke(cli, [
-                "parse", str(input_file),
-                "--output", str(output_file)
-            ])
-            
-            assert result.exit_code == 0
-            assert f"Output written to: {output_file}" in result.output
-            
-            # Verify file was written
-            assert output_file.exists()
-            content = output_file.read_text()
-            assert "Language: python" in content
-            assert mock_parse_result.ast_text in content
-
-
-def test_parse_command_error_handling(runner):
-    """Test parse command error handling."""
-    error_result = ParseResult(
+    fs.create_dir("/t")
+    input_file = Path("/t/input.py")
+    output_file = Path("/t/output.txt")
+    input_file.write_text("x = 1")
+    
+    parse_cmd.main([str(input_file), "--output", str(output_file)], standalone_mode=False)
+    output = capsys.readouterr().out
+    
+    assert f"Output written to: {output_file}" in output
+    
+    # Verify file was written
+    assert output_file.exists()
+    content = output_file.read_text()
+    assert "Language: python" in content
+    assert mock_parse_result.ast_text in content
+
+
+@pytest.mark.parametrize("patched_parse", [
+    ParseResult(
         language="python",
         ast_text="",
         metadata={},
         error="Failed to parse: syntax error"
-    )
+    ),
+], indirect=True)
+def test_parse_command_error_handling(parse_cmd, capsys, patched_parse, fs):
+    """Test parse command error handling."""
+    temp_file = "/src/invalid.py"
+    fs.create_file(temp_file, contents="invalid python !!!")
     
-    with tempfile.NamedTemporaryFile(suffix=".py", delete=False) as f:
-        f.write(b"invalid python !!!")
-        temp_file = f.name
+    # CLI doesn't fail on parse errors
+    parse_cmd.main([temp_file], standalone_mode=False)
+    output = capsys.readouterr().out
     
-    try:
-        with patch("mcp_code_parser.cli.parse_file") as mock_parse:
-            mock_parse.return_value = error_result
-            
-            result = runner.invoke(cli, ["parse", temp_file])
-            
-            assert result.exit_code == 0  # CLI doesn't fail on parse errors
-            assert "Error parsing file: Failed to parse: syntax error" in result.output
-    finally:
-        Path(temp_file).unlink()
+    assert "Error parsing file: Failed to parse: syntax error" in output
 
 
-def test_parse_command_file_not_found(runner):
+def test_parse_command_file_not_found():
     """Test parse command with non-existent file."""
-    result = runner.invoke(cli, ["parse", "/nonexistent/file.py"])
-    
-    assert result.exit_code == 2  # Click's error code for bad parameters
-    assert "does not exist" in result.output
+    # standalone_mode=False raises the usage error instead of exiting with 2
+    with pytest.raises(click.UsageError, match="does not exist"):
+        cli.main(["parse", "/nonexistent/file.py"], prog_name="cli", standalone_mode=False)
 
 
-def test_serve_command(runner):
+def test_serve_command(runner, mcp_server_stub):
     """Test serve command starts server."""
-    with patch("mcp_code_parser.mcp_server.run_stdio") as mock_serve:
-        result = runner.invoke(cli, ["serve"])
-        
-        assert result.exit_code == 0
-        mock_serve.assert_called_once()
+    result = runner.invoke(cli, ["serve"])
+    
+    assert result.exit_code == 0
+    mcp_server_stub.run_stdio.assert_called_once()
 
 
-def test_parse_command_json_with_error(runner):
-    """Test parse command JSON output with error."""
-    error_result = ParseResult(
+def test_serve_command_configures_logging(runner, mcp_server_stub):
+    """Test serve command passes logging options to the server."""
+    result = runner.invoke(cli, ["serve", "--log-level", "DEBUG", "--log-dir", "server-logs"])
+    
+    assert result.exit_code == 0
+    mcp_server_stub.configure_logging.assert_called_once_with("DEBUG", None, "server-logs")
+
+
+@pytest.mark.parametrize("patched_parse", [
+    ParseResult(
         language="unknown",
         ast_text="",
         metadata={},
         error="Language not supported"
-    )
+    ),
+], indirect=True)
+def test_parse_command_json_with_error(parse_cmd, capsys, patched_parse, fs):
+    """Test parse command JSON output with error."""
+    temp_file = "/src/unknown.xyz"
+    fs.create_file(temp_file, contents="unknown content")
+    
+    parse_cmd.main([temp_file, "--format", "json"], standalone_mode=False)
+    output = capsys.readouterr().out
+    
+    output_data = json.loads(output)
+    assert output_data["success"] is False
+    assert output_data["error"] == "Language not supported"
+    assert output_data["ast"] == ""
+
+
+def test_parse_many_command_outputs_json_lines(runner, mock_parse_result, fs):
+    """Test parse-many writes one JSON object per file, in argument order."""
+    first = Path("/src/first.py")
+    second = Path("/src/second.py")
+    fs.create_file(first, contents="def first(): pass")
+    fs.create_file(second, contents="def second(): pass")
+    
+    with patch("mcp_code_parser.cli.parse_files", new=AsyncMock(return_value=[mock_parse_result] * 2)) as mock_parse:
+        result = runner.invoke(cli, ["parse-many", str(first), str(second), "-j", "2"])
+        
+        assert result.exit_code == 0
+        mock_parse.assert_awaited_once_with([str(first), str(second)], None, max_concurrency=2)
+    
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert [line["file"] for line in lines] == [str(first), str(second)]
+    assert all(line["success"] for line in lines)
+    assert lines[0]["ast"] == mock_parse_result.ast_text
+
+
+def test_parse_many_command_parses_real_files(runner, tmp_path):
+    """Test parse-many end to end with the default parser."""
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"module_{index}.py"
+        path.write_text(f"def f{index}(): return {index}")
+        paths.append(str(path))
+    
+    result = runner.invoke(cli, ["parse-many", *paths])
+    
+    assert result.exit_code == 0
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert len(lines) == 3
+    assert all(line["language"] == "python" and line["success"] for line in lines)
+
+
+def test_parse_many_command_rejects_negative_concurrency(runner, tmp_path):
+    """Test that a negative --concurrency is a usage error, not a traceback."""
+    path = tmp_path / "module.py"
+    path.write_text("x = 1")
+    
+    result = runner.invoke(cli, ["parse-many", str(path), "-j", "-1"])
     
-    with tempfile.NamedTemporaryFile(suffix=".xyz", delete=False) as f:
-        f.write(b"unknown content")
-        temp_file = f.name
-    
-    try:
-        with patch("mcp_code_parser.cli.parse_file") as mock_parse:
-            mock_parse.return_value = error_result
-            
-            result = runner.invoke(cli, ["parse", temp_file, "--format", "json"])
-            
-            assert result.exit_code == 0
-            
-            output_data = json.loads(result.output)
-            assert output_data["success"] is False
-            assert output_data["error"] == "Language not supported"
-            assert output_data["ast"] == ""
-    finally:
-        Path(temp_file).unlink()
\ No newline at end of file
+    assert result.exit_code == 2
+    assert "Invalid value for '--concurrency'" in result.output
@@ -1,98 +1,60 @@
 """Integration tests for mcp-code-parser parser."""
 
 import asyncio
-from pathlib import Path
 
 import pytest
 
-from mcp_code_parser import parse_file, supported_languages
+from mcp_code_parser import parse_code, parse_file, supported_languages
 
+# Load every grammar once per session rather than in whichever test runs first
+pytestmark = [pytest.mark.slow, pytest.mark.usefixtures("agent_tools")]
 
-@pytest.fixture
-def samples_dir():
-    """Get samples directory."""
-    return Path(__file__).parent / "samples"
 
+# (sample file, expected language, node types any of which must appear)
+COMPLEX_SAMPLES = [
+    ("python_complex.py", "python", ("class",)),
+    ("javascript_complex.js", "javascript", ("function", "class")),
+    ("typescript_complex.ts", "typescript", ("class", "interface")),
+    ("go_complex.go", "go", ("func", "package")),
+    ("cpp_complex.cpp", "cpp", ("class", "function")),
+]
 
-@pytest.mark.asyncio
-async def test_parse_python_complex(samples_dir):
-    """Test parsing complex Python file."""
-    file_path = samples_dir / "python_complex.py"
-    result = await parse_file(str(file_path))
-    
-    assert result.success is True
-    assert result.language == "python"
-    assert "class" in result.ast_text
-    assert result.error is None
 
-
-@pytest.mark.asyncio
-async def test_parse_javascript_complex(samples_dir):
-    """Test parsing complex JavaScript file."""
-    file_path = samples_dir / "javascript_complex.js"
-    result = await parse_file(str(file_path))
+@pytest.mark.parametrize("filename,expected_lang,markers", COMPLEX_SAMPLES)
+async def test_parse_complex(samples_dir, filename, expected_lang, markers):
+    """Test parsing complex sample files."""
+    file_path = samples_dir / filename
+    result = await parse_file(str(file_path), expected_lang)
     
     assert result.success is True
-    assert result.language == "javascript"
-    assert "function" in result.ast_text or "class" in result.ast_text
+    assert result.language == expected_lang
+    assert any(marker in result.ast_text for marker in markers)
     assert result.error is None
 
 
-@pytest.mark.asyncio
-async def test_parse_typescript_complex(samples_dir):
-    """Test parsing complex TypeScript file."""
-    file_path = samples_dir / "typescript_complex.ts"
-    result = await parse_file(str(file_path))
+@pytest.mark.parametrize("filename,expected_lang,markers", COMPLEX_SAMPLES)
+async def test_parse_complex_source(sample_bytes, filename, expected_lang, markers):
+    """Test parsing complex sample sources passed as code rather than paths."""
+    result = await parse_code(sample_bytes[filename].decode("utf-8"), expected_lang)
     
     assert result.success is True
-    assert result.language == "typescript"
-    assert "class" in result.ast_text or "interface" in result.ast_text
-    assert result.error is None
+    assert result.language == expected_lang
+    assert any(marker in result.ast_text for marker in markers)
 
 
-@pytest.mark.asyncio
-async def test_parse_go_complex(samples_dir):
-    """Test parsing complex Go file."""
-    file_path = samples_dir / "go_complex.go"
-    result = await parse_file(str(file_path))
-    
-    assert result.success is True
-    assert result.language == "go"
-    assert "func" in result.ast_text or "package" in result.ast_text
-    assert result.error is None
-
-
-@pytest.mark.asyncio
-async def test_parse_cpp_complex(samples_dir):
-    """Test parsing complex C++ file."""
-    file_path = samples_dir / "cpp_complex.cpp"
-    result = await parse_file(str(file_path))
-    
-    assert result.success is True
-    assert result.language == "cpp"
-    assert "class" in result.ast_text or "function" in result.ast_text
-    assert result.error is None
-
-
-@pytest.mark.asyncio
 async def test_auto_language_detection(samples_dir):
     """Test automatic language detection from file extension."""
-    test_files = [
-        ("python_complex.py", "python"),
-        ("javascript_complex.js", "javascript"),
-        ("typescript_complex.ts", "typescript"),
-        ("go_complex.go", "go"),
-        ("cpp_complex.cpp", "cpp"),
-    ]
+    # No language specified; the parses run concurrently
+    results = await asyncio.gather(*(
+        parse_file(str(samples_dir / filename))
+        for filename, _, _ in COMPLEX_SAMPLES
+    ))
     
-    for filename, expected_lang in test_files:
-        file_path = samples_dir / filename
-        result = await parse_file(str(file_path))  # No language specified
+    for (_, expected_lang, _), result in zip(COMPLEX_SAMPLES, results):
         assert result.language == expected_lang
         assert result.success is True
 
 
-@pytest.mark.asyncio
 async def test_parse_nonexistent_file():
     """Test parsing non-existent file."""
     result = await parse_file("/path/to/nonexistent/file.py")
@@ -102,7 +64,6 @@ async def test_parse_nonexistent_file():
     assert "Error reading file" in result.error
 
 
-@pytest.mark.asyncio
 async def test_supported_languages():
     """Test getting supported languages."""
     languages = supported_languages()
@@ -116,7 +77,6 @@ async def test_supported_languages():
     assert "cpp" in languages
 
 
-@pytest.mark.asyncio
 async def test_parse_small_code_snippets():
     """Test parsing small code snippets."""
     snippets = [
@@ -125,10 +85,11 @@ async def test_parse_small_code_snippets():
         ("go", "func main() { fmt.Println(\"Hello\") }"),
     ]
     
-    for lang, code in snippets:
-        from mcp_code_parser import parse_code
-        result = await parse_code(code, lang)
-        
+    results = await asyncio.gather(*(
+        parse_code(code, lang) for lang, code in snippets
+    ))
+    
+    for (lang, _), result in zip(snippets, results):
         assert result.success is True
         assert result.language == lang
         assert result.error is None
@@ -0,0 +1,103 @@
+"""Tests for logging configuration."""
+
+import logging
+import logging.handlers
+
+from mcp_code_parser import logging as mcp_logging
+from mcp_code_parser.logging import setup_logging, start_queue_logging
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+def test_start_queue_logging_moves_handlers_to_listener():
+    """Test that records reach the original handlers through the queue."""
+    logger = logging.getLogger("mcp_code_parser.test_queue")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = _ListHandler()
+    logger.handlers = [handler]
+
+    listener = start_queue_logging(logger)
+    try:
+        assert listener is not None
+        assert len(logger.handlers) == 1
+        assert isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+
+        logger.info("request %s %s", "GET", "/health")
+    finally:
+        listener.stop()
+        logger.handlers = []
+
+    assert handler.messages == ["request GET /health"]
+
+
+def test_start_queue_logging_without_handlers():
+    """Test that a logger without handlers is left untouched."""
+    logger = logging.getLogger("mcp_code_parser.test_queue_empty")
+    logger.handlers = []
+
+    assert start_queue_logging(logger) is None
+    assert logger.handlers == []
+
+
+def _reset_package_logger(logger):
+    """Stop setup_logging's file listener and detach its handlers."""
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+    if mcp_logging._file_listener is not None:
+        mcp_logging._file_listener.stop()
+        mcp_logging._file_listener = None
+
+
+def test_stop_listener_is_idempotent():
+    """Test that a listener stopped explicitly is skipped by the atexit hook."""
+    handler = logging.NullHandler()
+    _, listener = mcp_logging._start_listener([handler])
+    assert listener.running
+
+    listener.stop()
+    # What the atexit hook does at interpreter exit
+    listener.stop()
+
+    assert not listener.running
+
+
+def test_setup_logging_writes_file_on_listener_thread(tmp_path):
+    """Test that the file handler sits behind a queue while stderr stays direct."""
+    log_file = tmp_path / "server.log"
+    logger = setup_logging("DEBUG", log_file=str(log_file))
+    try:
+        types = [type(handler) for handler in logger.handlers]
+        assert types == [logging.StreamHandler, logging.handlers.QueueHandler]
+
+        logger.debug("queued %s", "message")
+        # Stopping flushes the queue; the reset below then leaves it alone
+        mcp_logging._file_listener.stop()
+
+        assert "queued message" in log_file.read_text()
+    finally:
+        _reset_package_logger(logger)
+
+
+def test_setup_logging_replaces_and_closes_handlers(tmp_path):
+    """Test that reconfiguring closes the previous file and shares one formatter."""
+    logger = setup_logging("DEBUG", log_file=str(tmp_path / "first.log"), log_to_stderr=False)
+    try:
+        first_listener = mcp_logging._file_listener
+        first_file_handler = first_listener.handlers[0]
+
+        logger = setup_logging("DEBUG", log_file=str(tmp_path / "second.log"))
+
+        assert not first_listener.running
+        assert first_file_handler.stream is None
+        assert logger.handlers[0].formatter is mcp_logging._file_listener.handlers[0].formatter
+    finally:
+        _reset_package_logger(logger)
@@ -8,6 +8,9 @@ from pathlib import Path
 
 import pytest
 
+# Each test drives a real server subprocess over stdio
+pytestmark = pytest.mark.slow
+
 
 class MCPClient:
     """Simple MCP client for testing."""
@@ -1,15 +1,31 @@
 """Integration tests for simple HTTP server."""
 
 import asyncio
+import inspect
 import json
+import logging
+import logging.handlers
 import multiprocessing
+import socket
+import threading
 import time
+import typing
+from datetime import datetime
 from typing import Optional
 
 import httpx
 import pytest
 
-from mcp_code_parser.mcp_http_server import run_server
+from mcp_code_parser import mcp_http_server
+from mcp_code_parser.mcp_http_server import (
+    MAX_REQUEST_BYTES,
+    STREAM_READ_THRESHOLD,
+    MCPHandler,
+    PooledHTTPServer,
+    _accepts_encoding,
+    _encoding_qvalues,
+    run_server,
+)
 
 
 def _run_mcp_server(host: str, port: int):
@@ -27,7 +43,8 @@ class MCPServerProcess:
         
     def start(self):
         """Start the MCP server in a subprocess."""
-        self.process = multiprocessing.Process(
+        # Spawn rather than fork: pytest-xdist workers are multi-threaded
+        self.process = multiprocessing.get_context("spawn").Process(
             target=_run_mcp_server, 
             args=(self.host, self.port)
         )
@@ -76,7 +93,6 @@ async def mcp_client(mcp_server):
         yield client
 
 
-@pytest.mark.asyncio
 async def test_mcp_health_check(mcp_client):
     """Test health check endpoint."""
     response = await mcp_client.get("/health")
@@ -87,10 +103,10 @@ async def test_mcp_health_check(mcp_client):
     assert data["status"] == "healthy"
     assert data["service"] == "mcp-code-parser"
     assert "timestamp" in data
+    datetime.fromisoformat(data["timestamp"])
     assert data["version"] == "0.1.0"
 
 
-@pytest.mark.asyncio
 async def test_mcp_list_languages(mcp_client):
     """Test list languages endpoint."""
     response = await mcp_client.get("/languages")
@@ -106,7 +122,41 @@ async def test_mcp_list_languages(mcp_client):
     assert data["count"] == len(data["languages"])
 
 
-@pytest.mark.asyncio
+async def test_mcp_pretty_query_param(mcp_client):
+    """Responses are compact unless ?pretty=1 is given."""
+    compact = await mcp_client.get("/languages")
+    pretty = await mcp_client.get("/languages?pretty=1")
+    
+    assert b"\n" not in compact.content
+    assert b"\n  " in pretty.content
+    assert pretty.json() == compact.json()
+    
+    response = await mcp_client.post(
+        "/parse?pretty=1",
+        json={"content": "x = 1", "language": "python"}
+    )
+    assert response.status_code == 200
+    assert b"\n  " in response.content
+
+
+async def test_mcp_static_endpoints_support_etag(mcp_client):
+    """Test that /languages and /info answer If-None-Match with 304."""
+    for path in ("/languages", "/info"):
+        first = await mcp_client.get(path)
+        etag = first.headers["etag"]
+        assert first.headers["content-length"] == str(len(first.content))
+        assert "date" in first.headers and "server" in first.headers
+        
+        cached = await mcp_client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        
+        stale = await mcp_client.get(path, headers={"If-None-Match": '"stale"'})
+        assert stale.status_code == 200
+        assert stale.content == first.content
+
+
 async def test_mcp_info(mcp_client):
     """Test info endpoint."""
     response = await mcp_client.get("/info")
@@ -120,7 +170,6 @@ async def test_mcp_info(mcp_client):
     assert "python" in info
 
 
-@pytest.mark.asyncio
 async def test_mcp_parse_code(mcp_client):
     """Test parse code endpoint."""
     response = await mcp_client.post(
@@ -141,7 +190,6 @@ async def test_mcp_parse_code(mcp_client):
     assert data["error"] is None
 
 
-@pytest.mark.asyncio
 async def test_mcp_parse_file(mcp_client, tmp_path):
     """Test parse file endpoint."""
     # Create test file
@@ -172,7 +220,139 @@ console.log(result);
     assert data["error"] is None
 
 
-@pytest.mark.asyncio
+async def test_mcp_parse_file_repeat_is_cached(mcp_client, tmp_path):
+    """Test that repeated parse-file requests return the same cached body."""
+    test_file = tmp_path / "cached.py"
+    test_file.write_text("def cached():\n    return 1\n")
+    
+    first = await mcp_client.post("/parse-file", json={"file_path": str(test_file)})
+    second = await mcp_client.post("/parse-file", json={"file_path": str(test_file)})
+    
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["content-length"] == str(len(first.content))
+    assert second.json()["success"] is True
+
+
+async def test_mcp_parse_code_large_response_is_chunked(mcp_client):
+    """Test that large parse responses are streamed with chunked encoding."""
+    content = "x = 1\n" * 5000
+    response = await mcp_client.post(
+        "/parse",
+        json={"content": content, "language": "python"},
+        headers={"Accept-Encoding": "identity"}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers.get("transfer-encoding") == "chunked"
+    assert "content-length" not in response.headers
+    
+    data = response.json()
+    assert data["success"] is True
+    assert data["ast"].count("expression_statement") == 5000
+
+
+def test_mcp_large_response_to_http10_client_is_not_chunked(mcp_server):
+    """Test that HTTP/1.0 clients get a Content-Length body instead of chunked encoding."""
+    body = json.dumps({"content": "x = 1\n" * 5000, "language": "python"}).encode()
+    with socket.create_connection((mcp_server.host, mcp_server.port), timeout=5) as sock:
+        sock.sendall(
+            b"POST /parse HTTP/1.0\r\nContent-Type: application/json\r\n"
+            b"Content-Length: %d\r\n\r\n" % len(body) + body
+        )
+        response = sock.makefile("rb").read()
+    
+    head, _, payload = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 ")
+    assert b"Transfer-Encoding" not in head
+    assert b"\r\nContent-Length: %d" % len(payload) in head
+    
+    data = json.loads(payload)
+    assert data["success"] is True
+    assert data["ast"].count("expression_statement") == 5000
+
+
+async def test_mcp_large_response_is_gzipped(mcp_client):
+    """Test that large responses are compressed when the client accepts gzip."""
+    content = "x = 1\n" * 500
+    response = await mcp_client.post(
+        "/parse",
+        json={"content": content, "language": "python"},
+        headers={"Accept-Encoding": "gzip"}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == "gzip"
+    assert response.headers.get("vary") == "Accept-Encoding"
+    assert response.json()["success"] is True
+
+
+async def test_mcp_small_or_refused_responses_are_not_compressed(mcp_client):
+    """Test that small bodies and refused gzip skip compression."""
+    small = await mcp_client.post(
+        "/check-language",
+        json={"language": "python"},
+        headers={"Accept-Encoding": "gzip"}
+    )
+    assert "content-encoding" not in small.headers
+    
+    refused = await mcp_client.post(
+        "/parse",
+        json={"content": "x = 1\n" * 500, "language": "python"},
+        headers={"Accept-Encoding": "gzip;q=0"}
+    )
+    assert "content-encoding" not in refused.headers
+    assert refused.json()["success"] is True
+    
+    # An explicit q=0 wins over the wildcard
+    refused_with_wildcard = await mcp_client.post(
+        "/parse",
+        json={"content": "x = 1\n" * 500, "language": "python"},
+        headers={"Accept-Encoding": "gzip;q=0, *"}
+    )
+    assert refused_with_wildcard.headers.get("content-encoding") in (None, "br")
+
+
+def test_accept_encoding_qvalues():
+    """Test Accept-Encoding parsing and the wildcard fallback."""
+    qvalues = _encoding_qvalues("GZIP;q=0, br ; q=0.5, *;q=1, deflate;q=bad")
+    
+    assert qvalues == {"gzip": 0.0, "br": 0.5, "*": 1.0, "deflate": 0.0}
+    assert not _accepts_encoding(qvalues, "gzip")
+    assert _accepts_encoding(qvalues, "br")
+    assert not _accepts_encoding(qvalues, "deflate")
+    assert _accepts_encoding(qvalues, "zstd")
+    assert not _accepts_encoding(_encoding_qvalues("gzip;q=0.000"), "gzip")
+    assert not _accepts_encoding(_encoding_qvalues("br"), "gzip")
+
+
+async def test_mcp_parse_files(mcp_client, tmp_path):
+    """Test batch parse files endpoint."""
+    py_file = tmp_path / "a.py"
+    py_file.write_text("def a(): pass")
+    go_file = tmp_path / "b.go"
+    go_file.write_text("package main")
+    missing = tmp_path / "missing.py"
+    
+    response = await mcp_client.post(
+        "/parse-files",
+        json={"file_paths": [str(py_file), str(go_file), str(missing)]}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    
+    assert data["count"] == 3
+    results = data["results"]
+    assert [r["file_path"] for r in results] == [str(py_file), str(go_file), str(missing)]
+    assert results[0]["success"] is True
+    assert results[0]["language"] == "python"
+    assert results[1]["success"] is True
+    assert results[1]["language"] == "go"
+    assert results[2]["success"] is False
+    assert "Error reading file" in results[2]["error"]
+
+
 async def test_mcp_check_language_available(mcp_client):
     """Test check language endpoint."""
     # Test supported language
@@ -204,7 +384,6 @@ async def test_mcp_check_language_available(mcp_client):
     assert "not supported" in data["message"]
 
 
-@pytest.mark.asyncio
 async def test_mcp_parse_code_error(mcp_client):
     """Test parse code error handling."""
     response = await mcp_client.post(
@@ -223,7 +402,6 @@ async def test_mcp_parse_code_error(mcp_client):
     assert "not supported" in data["error"]
 
 
-@pytest.mark.asyncio
 async def test_mcp_parse_file_not_found(mcp_client):
     """Test parse file with non-existent file."""
     response = await mcp_client.post(
@@ -241,7 +419,6 @@ async def test_mcp_parse_file_not_found(mcp_client):
     assert "Error reading file" in data["error"]
 
 
-@pytest.mark.asyncio
 async def test_mcp_missing_required_fields(mcp_client):
     """Test endpoints with missing required fields."""
     # Parse without content
@@ -264,6 +441,16 @@ async def test_mcp_missing_required_fields(mcp_client):
     data = response.json()
     assert "Missing required field" in data["error"]
     
+    # Parse files without file_paths
+    response = await mcp_client.post(
+        "/parse-files",
+        json={}
+    )
+    
+    assert response.status_code == 400
+    data = response.json()
+    assert "Missing required field" in data["error"]
+    
     # Check language without language
     response = await mcp_client.post(
         "/check-language",
@@ -275,7 +462,6 @@ async def test_mcp_missing_required_fields(mcp_client):
     assert "Missing required field" in data["error"]
 
 
-@pytest.mark.asyncio
 async def test_mcp_invalid_json(mcp_client):
     """Test invalid JSON handling."""
     response = await mcp_client.post(
@@ -289,7 +475,62 @@ async def test_mcp_invalid_json(mcp_client):
     assert "Invalid JSON" in data["error"]
 
 
-@pytest.mark.asyncio
+async def test_mcp_large_request_body(mcp_client):
+    """Test that bodies above the streaming threshold are read completely."""
+    padding = "x" * (STREAM_READ_THRESHOLD + 12345)
+    response = await mcp_client.post(
+        "/check-language",
+        json={"language": "python", "padding": padding}
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["language"] == "python"
+
+
+def test_mcp_oversized_request_body_rejected(mcp_server):
+    """Test that an oversized Content-Length is refused without reading the body."""
+    with socket.create_connection((mcp_server.host, mcp_server.port), timeout=5) as sock:
+        sock.sendall(
+            b"POST /parse HTTP/1.1\r\nHost: test\r\n"
+            b"Content-Length: %d\r\n\r\n" % (MAX_REQUEST_BYTES + 1)
+        )
+        response = sock.makefile("rb").read()
+    
+    assert response.startswith(b"HTTP/1.1 413 ")
+    assert b"\r\nConnection: close\r\n" in response
+
+
+def test_mcp_invalid_content_length_closes_connection(mcp_server):
+    """Test that a 400 for a bad Content-Length tells the client the connection ends."""
+    with socket.create_connection((mcp_server.host, mcp_server.port), timeout=5) as sock:
+        sock.sendall(b"POST /parse HTTP/1.1\r\nHost: test\r\nContent-Length: nope\r\n\r\n")
+        response = sock.makefile("rb").read()
+    
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"\r\nConnection: close\r\n" in response
+
+
+async def test_mcp_keep_alive_responses_do_not_close(mcp_client):
+    """Test that ordinary responses leave the connection open."""
+    response = await mcp_client.get("/health")
+    
+    assert response.status_code == 200
+    assert "connection" not in response.headers
+
+
+async def test_mcp_invalid_utf8_body(mcp_client):
+    """Test that bodies which are not valid UTF-8 are rejected."""
+    response = await mcp_client.post(
+        "/parse",
+        content=b'{"content": "\xff\xfe", "language": "python"}',
+        headers={"Content-Type": "application/json"}
+    )
+    
+    assert response.status_code == 400
+    data = response.json()
+    assert "Invalid JSON" in data["error"]
+
+
 async def test_mcp_404_endpoints(mcp_client):
     """Test 404 handling."""
     response = await mcp_client.get("/nonexistent")
@@ -299,7 +540,6 @@ async def test_mcp_404_endpoints(mcp_client):
     assert response.status_code == 404
 
 
-@pytest.mark.asyncio
 async def test_mcp_concurrent_requests(mcp_client):
     """Test handling concurrent requests."""
     # Create multiple parse tasks
@@ -322,4 +562,111 @@ async def test_mcp_concurrent_requests(mcp_client):
         assert response.status_code == 200
         data = response.json()
         assert data["success"] is True
-        assert data["language"] == "javascript"
\ No newline at end of file
+        assert data["language"] == "javascript"
+
+
+@pytest.mark.slow
+async def test_pooled_server_handles_concurrent_requests():
+    """Test that a small worker pool serves more concurrent requests than workers."""
+    server = PooledHTTPServer(("127.0.0.1", 0), MCPHandler, max_workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        # One keep-alive connection per worker; further connections would get 503
+        limits = httpx.Limits(max_connections=server.max_workers)
+        async with httpx.AsyncClient(base_url=f"http://{host}:{port}", limits=limits) as client:
+            responses = await asyncio.gather(*(client.get("/health") for _ in range(10)))
+    finally:
+        server.shutdown()
+        server.server_close()
+    
+    assert server.max_workers == 2
+    assert [r.status_code for r in responses] == [200] * 10
+
+
+@pytest.mark.slow
+def test_pooled_server_rejects_when_idle_clients_hold_every_worker():
+    """Test that idle keep-alive clients get new requests a prompt 503 and do not block shutdown."""
+    server = PooledHTTPServer(("127.0.0.1", 0), MCPHandler, max_workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    idle = [socket.create_connection((host, port), timeout=5) for _ in range(server.max_workers + 1)]
+    try:
+        start = time.monotonic()
+        with socket.create_connection((host, port), timeout=5) as sock:
+            sock.sendall(b"GET /health HTTP/1.1\r\nHost: test\r\n\r\n")
+            response = sock.makefile("rb").read()
+        elapsed = time.monotonic() - start
+    
+        start = time.monotonic()
+        server.shutdown()
+        shutdown_elapsed = time.monotonic() - start
+    finally:
+        for client in idle:
+            client.close()
+        server.shutdown()
+        server.server_close()
+    
+    assert response.startswith(b"HTTP/1.1 503 ")
+    assert b"\r\nConnection: close\r\n" in response
+    assert b"Retry-After: 1\r\n" in response
+    assert elapsed < MCPHandler.timeout
+    assert shutdown_elapsed < MCPHandler.timeout
+
+
+def test_run_server_logs_through_queue(monkeypatch):
+    """Test that run_server attaches real handlers and moves them onto a listener thread."""
+    package_logger = logging.getLogger("mcp_code_parser")
+    listeners = []
+    handlers = []
+    original = mcp_http_server.start_queue_logging
+    
+    def start_queue_logging():
+        listener = original()
+        listeners.append(listener)
+        return listener
+    
+    monkeypatch.setattr(mcp_http_server, "start_queue_logging", start_queue_logging)
+    monkeypatch.setattr(PooledHTTPServer, "serve_forever", lambda self: handlers.extend(package_logger.handlers))
+    monkeypatch.setattr(MCPHandler, "loop", None, raising=False)
+    monkeypatch.setattr(package_logger, "handlers", [])
+    monkeypatch.setattr(package_logger, "level", package_logger.level)
+    try:
+        run_server("127.0.0.1", 0, max_workers=1)
+    finally:
+        for listener in listeners:
+            if listener is not None:
+                listener.stop()
+    
+    assert listeners[0] is not None
+    assert [type(handler) for handler in handlers] == [logging.handlers.QueueHandler]
+    assert isinstance(listeners[0].handlers[0], logging.StreamHandler)
+
+
+async def test_tool_results_are_serialized_as_json_text():
+    """Test that tool dicts reach FastMCP as ready-made JSON text."""
+    from mcp_code_parser.mcp_server import mcp
+    
+    content = await mcp.call_tool("parse_code", {"content": "x = 1", "language": "python"})
+    
+    assert len(content) == 1
+    result = json.loads(content[0].text)
+    assert result["success"] is True
+    assert "module" in result["ast"]
+    
+    # Argument schemas still come from the undecorated signatures
+    tools = {tool.name: tool for tool in await mcp.list_tools()}
+    assert tools["parse_code"].inputSchema["required"] == ["content", "language"]
+
+
+def test_tool_wrappers_declare_str_results():
+    """Test that tools advertise the str they return, not the wrapped dict."""
+    from mcp_code_parser import mcp_server
+    
+    for tool in (mcp_server.parse_code, mcp_server.parse_file, mcp_server.list_languages):
+        assert inspect.signature(tool).return_annotation is str
+        assert typing.get_type_hints(tool)["return"] is str
+        # The undecorated function keeps its own annotation
+        assert tool.__wrapped__.__annotations__["return"] is dict
@@ -1,5 +1,7 @@
 """Unit tests for parser functionality."""
 
+import dataclasses
+
 import pytest
 
 from mcp_code_parser.parsers.base import (
@@ -40,6 +42,30 @@ def test_parse_result():
     assert error_result.error == "Test error"
 
 
+def test_parse_result_to_dict():
+    """Test ParseResult serialization to the server response shape."""
+    result = ParseResult(
+        language="python",
+        ast_text="module",
+        metadata={"node_count": 1}
+    )
+    
+    assert result.to_dict() == {
+        "success": True,
+        "language": "python",
+        "ast": "module",
+        "metadata": {"node_count": 1},
+        "error": None,
+    }
+    
+    error_result = ParseResult(language="go", ast_text="", metadata={}, error="boom")
+    assert error_result.to_dict()["success"] is False
+    assert error_result.to_dict()["error"] == "boom"
+    
+    # Slotted dataclass: no per-instance __dict__
+    assert not hasattr(result, "__dict__")
+
+
 def test_language_detection():
     """Test language detection from file extension."""
     test_cases = [
@@ -73,11 +99,24 @@ def test_language_config():
     assert get_language_config("nonexistent") is None
 
 
+def test_language_config_is_immutable():
+    """Test that shared language configs cannot be modified."""
+    python_config = get_language_config("python")
+    
+    assert isinstance(python_config.node_types_to_include, tuple)
+    assert isinstance(python_config.file_extensions, tuple)
+    assert python_config.included_node_types == frozenset(python_config.node_types_to_include)
+    assert python_config.excluded_node_types == frozenset()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        python_config.name = "changed"
+
+
 def test_supported_languages():
     """Test getting supported languages."""
     languages = get_supported_languages()
     
-    assert isinstance(languages, list)
+    assert isinstance(languages, tuple)
+    assert list(languages) == sorted(languages)
     assert len(languages) >= 5
     assert "python" in languages
     assert "javascript" in languages
@@ -86,6 +125,16 @@ def test_supported_languages():
     assert "cpp" in languages
 
 
+def test_supported_languages_are_not_shared():
+    """Test that callers cannot change the list later callers receive."""
+    from mcp_code_parser import supported_languages
+    
+    languages = supported_languages()
+    languages.clear()
+    
+    assert "python" in supported_languages()
+
+
 def test_get_language_by_extension():
     """Test getting language by file extension."""
     assert get_language_by_extension(".py") == "python"
@@ -1,25 +1,26 @@
 """Unit tests for TreeSitterParser implementation."""
 
 import asyncio
-import tempfile
+import subprocess
+import sys
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from mcp_code_parser.cache import DiskParseCache
 from mcp_code_parser.parsers.base import GrammarNotFoundError, LanguageNotSupportedError
-from mcp_code_parser.parsers.tree_sitter import TreeSitterParser
+from mcp_code_parser.parsers.tree_sitter import TreeSitterParser, _import_grammar
 
 
 @pytest.fixture
 async def parser():
-    """Create TreeSitterParser instance."""
-    parser = TreeSitterParser()
+    """Create TreeSitterParser instance isolated from the user's disk cache."""
+    parser = TreeSitterParser(disk_cache=DiskParseCache(enabled=False))
     async with parser:
         yield parser
 
 
-@pytest.mark.asyncio
 async def test_parse_simple_python(parser):
     """Test parsing simple Python code."""
     code = "def hello():\n    return 'world'"
@@ -34,7 +35,6 @@ async def test_parse_simple_python(parser):
     assert result.error is None
     
 
-@pytest.mark.asyncio
 async def test_parse_unsupported_language(parser):
     """Test parsing with unsupported language."""
     result = await parser.parse("code", "brainfuck")
@@ -43,7 +43,6 @@ async def test_parse_unsupported_language(parser):
     assert "not supported" in result.error
 
 
-@pytest.mark.asyncio
 async def test_parse_file_encoding_issues(parser, tmp_path):
     """Test parsing files with different encodings."""
     # Create file with non-UTF8 encoding
@@ -57,7 +56,6 @@ async def test_parse_file_encoding_issues(parser, tmp_path):
     assert "function_definition" in result.ast_text
 
 
-@pytest.mark.asyncio
 async def test_parse_file_not_found(parser):
     """Test parsing non-existent file."""
     result = await parser.parse_file("/nonexistent/file.py")
@@ -66,7 +64,6 @@ async def test_parse_file_not_found(parser):
     assert "Error reading file" in result.error
 
 
-@pytest.mark.asyncio
 async def test_language_detection_edge_cases(parser, tmp_path):
     """Test language detection with edge cases."""
     # No extension
@@ -86,7 +83,6 @@ async def test_language_detection_edge_cases(parser, tmp_path):
     assert "Could not detect language" in result.error
 
 
-@pytest.mark.asyncio
 async def test_missing_language_error(parser):
     """Test error when language package is missing."""
     # Try to parse with a mocked missing language
@@ -99,7 +95,6 @@ async def test_missing_language_error(parser):
         assert "not supported" in result.error
 
 
-@pytest.mark.asyncio
 async def test_ast_formatting_includes_function_definition(parser):
     """Test that AST formatting includes function definitions."""
     code = "def test():\n    pass"
@@ -110,7 +105,25 @@ async def test_ast_formatting_includes_function_definition(parser):
     assert "identifier: 'test'" in result.ast_text
 
 
-@pytest.mark.asyncio
+async def test_ast_leaf_text_with_non_ascii(parser):
+    """Test that leaf text uses byte offsets correctly for non-ASCII source."""
+    code = "def café():\n    pass\n\ndef naïve():\n    pass\n"
+    result = await parser.parse(code, "python")
+    
+    assert result.success
+    assert "identifier: 'café'" in result.ast_text
+    assert "identifier: 'naïve'" in result.ast_text
+
+
+async def test_ast_long_leaf_is_truncated(parser):
+    """Test that long multi-byte leaves are truncated by characters."""
+    comment = "# " + "é" * 300
+    result = await parser.parse(comment + "\n", "python")
+    
+    assert result.success
+    assert f"comment: {comment[:47] + '...'!r}" in result.ast_text
+
+
 async def test_parser_reuse(parser):
     """Test that parsers are cached and reused."""
     # Parse twice with same language
@@ -120,9 +133,11 @@ async def test_parser_reuse(parser):
     # Both should succeed (even with mocked grammar)
     assert result1.language == "python"
     assert result2.language == "python"
+    
+    # Sequential parses share one pooled parser
+    assert len(parser._parser_pools["python"]) == 1
 
 
-@pytest.mark.asyncio
 async def test_concurrent_parsing(parser):
     """Test concurrent parsing operations."""
     # Create multiple parsing tasks
@@ -139,7 +154,6 @@ async def test_concurrent_parsing(parser):
         assert not isinstance(result, Exception)
 
 
-@pytest.mark.asyncio
 async def test_node_count_in_metadata(parser):
     """Test that node count is included in metadata."""
     code = "x = 1\ny = 2"
@@ -147,4 +161,181 @@ async def test_node_count_in_metadata(parser):
     
     assert result.success
     assert "node_count" in result.metadata
-    assert result.metadata["node_count"] > 0
\ No newline at end of file
+    assert result.metadata["node_count"] > 0
+
+
+async def test_incremental_parse_with_session(parser):
+    """Test that edits within a session reuse the previous tree."""
+    first = await parser.parse("x = 1", "python", session_id="buffer")
+    assert first.success
+    assert first.metadata["incremental"] is False
+    
+    # Replace "1" with "12"
+    edit = {
+        "start_byte": 4, "old_end_byte": 5, "new_end_byte": 6,
+        "start_point": [0, 4], "old_end_point": [0, 5], "new_end_point": [0, 6],
+    }
+    second = await parser.parse("x = 12", "python", session_id="buffer", edits=[edit])
+    
+    assert second.success
+    assert second.metadata["incremental"] is True
+    
+    full = await parser.parse("x = 12", "python")
+    assert second.ast_text == full.ast_text
+    assert second.metadata["node_count"] == full.metadata["node_count"]
+
+
+async def test_incremental_parse_invalid_edit(parser):
+    """Test that malformed edits are reported as errors."""
+    await parser.parse("x = 1", "python", session_id="buffer")
+    result = await parser.parse("x = 2", "python", session_id="buffer", edits=[{"start_byte": 4}])
+    
+    assert not result.success
+    assert "missing fields" in result.error
+
+
+async def test_incremental_parse_bad_edit_leaves_session_tree_untouched(parser):
+    """Test that an edit list failing partway does not half-edit the stored tree."""
+    await parser.parse("x = 1", "python", session_id="buffer")
+    stored = parser._session_trees["buffer"][1]
+    valid = {
+        "start_byte": 4, "old_end_byte": 5, "new_end_byte": 5,
+        "start_point": (0, 4), "old_end_point": (0, 5), "new_end_point": (0, 5),
+    }
+    # Complete but malformed, so it only fails when applied
+    malformed = dict(valid, start_byte="four")
+    
+    for edits in ([valid, {"start_byte": 4}], [valid, malformed]):
+        result = await parser.parse("x = 2", "python", session_id="buffer", edits=edits)
+        assert not result.success
+        assert parser._session_trees["buffer"][1] is stored
+        assert not stored.root_node.has_changes
+    
+    result = await parser.parse("x = 2", "python", session_id="buffer", edits=[valid])
+    assert result.success
+    assert result.metadata["incremental"] is True
+
+
+async def test_session_trees_are_bounded(parser):
+    """Test that only the most recent sessions are retained."""
+    for i in range(parser.MAX_SESSIONS + 2):
+        await parser.parse("x = 1", "python", session_id=f"s{i}")
+    
+    assert len(parser._session_trees) == parser.MAX_SESSIONS
+    assert "s0" not in parser._session_trees
+
+
+async def test_disk_cache_skips_reparse(tmp_path):
+    """Test that unchanged content is served from the disk cache."""
+    code = "def cached():\n    return 1"
+    first = await TreeSitterParser(disk_cache=DiskParseCache(tmp_path)).parse(code, "python")
+    assert first.success
+    
+    # A fresh parser has no grammar loaded, so a hit must not touch tree-sitter
+    parser = TreeSitterParser(disk_cache=DiskParseCache(tmp_path))
+    second = await parser.parse(code, "python")
+    
+    assert second.ast_text == first.ast_text
+    assert second.metadata == first.metadata
+    assert parser._parser_pools == {}
+
+
+async def test_result_cache_returns_same_result(tmp_path):
+    """Test that repeated parses of the same content are served from memory."""
+    parser = TreeSitterParser(disk_cache=DiskParseCache(tmp_path, enabled=False))
+    
+    first = await parser.parse("x = 1", "python")
+    second = await parser.parse("x = 1", "python")
+    other = await parser.parse("x = 2", "python")
+    
+    assert second == first
+    assert second is not first
+    assert other.success
+    assert len(parser._result_cache) == 2
+
+
+async def test_result_cache_hits_are_independent_copies(tmp_path):
+    """Test that mutating a returned result does not change later cache hits."""
+    parser = TreeSitterParser(disk_cache=DiskParseCache(tmp_path, enabled=False))
+    
+    first = await parser.parse("x = 1", "python")
+    first.metadata["node_count"] = -1
+    second = await parser.parse("x = 1", "python")
+    second.metadata["extra"] = True
+    third = await parser.parse("x = 1", "python")
+    
+    assert third.metadata["node_count"] > 0
+    assert "extra" not in third.metadata
+    assert third.metadata is not second.metadata
+
+
+async def test_deeply_nested_code(parser):
+    """Test that formatting deep trees does not hit the recursion limit."""
+    depth = sys.getrecursionlimit() + 100
+    code = "x = " + "[" * depth + "]" * depth
+    
+    result = await parser.parse(code, "python")
+    
+    assert result.success
+    assert result.metadata["node_count"] > depth
+
+
+def test_grammars_are_imported_lazily():
+    """Test that parsing one language does not import other grammar packages."""
+    code = (
+        "import asyncio, sys\n"
+        "from mcp_code_parser.cache import DiskParseCache\n"
+        "from mcp_code_parser.parsers.tree_sitter import TreeSitterParser\n"
+        "parser = TreeSitterParser(disk_cache=DiskParseCache(enabled=False))\n"
+        "assert asyncio.run(parser.parse('x = 1', 'python')).success\n"
+        "print(sorted(m for m in sys.modules if m.startswith('tree_sitter_') and '.' not in m))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    
+    assert result.stdout.strip() == "['tree_sitter_python']"
+
+
+def test_language_availability_does_not_import_grammars():
+    """Test that availability checks locate grammar packages without importing them."""
+    code = (
+        "import asyncio, sys\n"
+        "from mcp_code_parser.parsers.tree_sitter import TreeSitterParser\n"
+        "parser = TreeSitterParser()\n"
+        "print(asyncio.run(parser.is_language_available('python')),\n"
+        "      asyncio.run(parser.is_language_available('cobol')))\n"
+        "print(sorted(m for m in sys.modules if m.startswith('tree_sitter_')))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    
+    assert result.stdout.split("\n")[:2] == ["True False", "[]"]
+
+
+async def test_parse_without_formatting(parser):
+    """Test that format=False returns metadata only."""
+    code = "def test():\n    pass"
+    
+    metadata_only = await parser.parse(code, "python", format=False)
+    assert metadata_only.success
+    assert metadata_only.ast_text == ""
+    
+    full = await parser.parse(code, "python")
+    assert "function_definition" in full.ast_text
+    assert full.metadata["node_count"] == metadata_only.metadata["node_count"]
+    
+    # Served from the cached full result without clearing its text
+    cached = await parser.parse(code, "python", format=False)
+    assert cached.ast_text == ""
+    assert full.ast_text
+
+
+def test_missing_grammar_import_is_memoized():
+    """Test that a failed grammar import is not retried."""
+    _import_grammar.cache_clear()
+    try:
+        with patch("importlib.import_module", side_effect=ImportError("missing")) as mock_import:
+            assert _import_grammar("tree_sitter_missing") is None
+            assert _import_grammar("tree_sitter_missing") is None
+        
+        assert mock_import.call_count == 1
+    finally:
+        _import_grammar.cache_clear()
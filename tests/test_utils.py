@@ -1,16 +1,19 @@
 """Unit tests for utility functions."""
 
-import tempfile
+import json
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
+from mcp_code_parser import utils
 from mcp_code_parser.utils import (
     detect_language_from_file,
     get_cache_dir,
     get_grammar_cache_dir,
     hash_content,
+    json_dumps,
+    json_loads,
     safe_read_file,
 )
 
@@ -32,56 +35,70 @@ def test_cache_directory_creation():
             assert mock_mkdir.call_count >= 2
 
 
-def test_cache_directory_permissions():
+def test_cache_directory_permissions(tmp_path):
     """Test that cache directories are created with proper permissions."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        with patch("pathlib.Path.home") as mock_home:
-            mock_home.return_value = Path(tmpdir)
-            
-            cache_dir = get_cache_dir()
-            grammar_dir = get_grammar_cache_dir()
-            
-            assert cache_dir.exists()
-            assert cache_dir.is_dir()
-            assert grammar_dir.exists()
-            assert grammar_dir.is_dir()
+    with patch("pathlib.Path.home") as mock_home:
+        mock_home.return_value = tmp_path
+        
+        cache_dir = get_cache_dir()
+        grammar_dir = get_grammar_cache_dir()
+        
+        assert cache_dir.exists()
+        assert cache_dir.is_dir()
+        assert grammar_dir.exists()
+        assert grammar_dir.is_dir()
 
 
-def test_safe_read_file_encodings():
+def test_safe_read_file_encodings(tmp_path):
     """Test reading files with different encodings."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # UTF-8 file
-        utf8_file = Path(tmpdir) / "utf8.txt"
-        utf8_content = "Hello 世界 🌍"
-        utf8_file.write_text(utf8_content, encoding="utf-8")
-        
-        assert safe_read_file(str(utf8_file)) == utf8_content
-        
-        # Latin-1 file
-        latin1_file = Path(tmpdir) / "latin1.txt"
-        latin1_content = "Café façade"
-        latin1_file.write_bytes(latin1_content.encode("latin-1"))
-        
-        assert safe_read_file(str(latin1_file)) == latin1_content
-        
-        # ASCII file
-        ascii_file = Path(tmpdir) / "ascii.txt"
-        ascii_content = "Plain ASCII text"
-        ascii_file.write_text(ascii_content, encoding="ascii")
-        
-        assert safe_read_file(str(ascii_file)) == ascii_content
+    # UTF-8 file
+    utf8_file = tmp_path / "utf8.txt"
+    utf8_content = "Hello 世界 🌍"
+    utf8_file.write_text(utf8_content, encoding="utf-8")
+    
+    assert safe_read_file(str(utf8_file)) == utf8_content
+    
+    # Latin-1 file
+    latin1_file = tmp_path / "latin1.txt"
+    latin1_content = "Café façade"
+    latin1_file.write_bytes(latin1_content.encode("latin-1"))
+    
+    assert safe_read_file(str(latin1_file)) == latin1_content
+    
+    # ASCII file
+    ascii_file = tmp_path / "ascii.txt"
+    ascii_content = "Plain ASCII text"
+    ascii_file.write_text(ascii_content, encoding="ascii")
+    
+    assert safe_read_file(str(ascii_file)) == ascii_content
 
 
-def test_safe_read_file_encoding_fallback():
+def test_safe_read_file_encoding_fallback(tmp_path):
     """Test encoding fallback for problematic files."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create a file with mixed/corrupted encoding
-        bad_file = Path(tmpdir) / "bad.txt"
-        bad_file.write_bytes(b"Valid UTF-8 \xc3\xa9 then bad \xff\xfe bytes")
-        
-        # Should fall back to latin-1
-        content = safe_read_file(str(bad_file))
-        assert isinstance(content, str)  # Should not raise exception
+    # Create a file with mixed/corrupted encoding
+    bad_file = tmp_path / "bad.txt"
+    bad_file.write_bytes(b"Valid UTF-8 \xc3\xa9 then bad \xff\xfe bytes")
+    
+    # Should fall back to latin-1
+    content = safe_read_file(str(bad_file))
+    assert isinstance(content, str)  # Should not raise exception
+
+
+def test_safe_read_file_normalizes_newlines(tmp_path):
+    """Test that CRLF and CR line endings are read as LF, like text mode."""
+    path = tmp_path / "crlf.py"
+    path.write_bytes(b"a = 1\r\nb = 2\rc = '\xc3\xa9'\n")
+    
+    assert safe_read_file(str(path)) == "a = 1\nb = 2\nc = '\u00e9'\n"
+
+
+def test_safe_read_file_large_file(tmp_path):
+    """Test reading a file above the readahead hint threshold."""
+    path = tmp_path / "large.py"
+    content = "x = 'é'\n" * 200_000
+    path.write_text(content, encoding="utf-8")
+    
+    assert safe_read_file(str(path)) == content
 
 
 def test_safe_read_file_not_found():
@@ -90,18 +107,19 @@ def test_safe_read_file_not_found():
         safe_read_file("/nonexistent/file.txt")
 
 
-def test_safe_read_file_permission_denied():
+def test_safe_read_file_permission_denied(tmp_path):
     """Test reading file without permissions."""
-    with tempfile.NamedTemporaryFile() as f:
-        # Make file unreadable
-        Path(f.name).chmod(0o000)
-        
-        try:
-            with pytest.raises(PermissionError):
-                safe_read_file(f.name)
-        finally:
-            # Restore permissions for cleanup
-            Path(f.name).chmod(0o644)
+    path = tmp_path / "secret.txt"
+    path.write_text("secret")
+    # Make file unreadable
+    path.chmod(0o000)
+    
+    try:
+        with pytest.raises(PermissionError):
+            safe_read_file(str(path))
+    finally:
+        # Restore permissions for cleanup
+        path.chmod(0o644)
 
 
 def test_detect_language_edge_cases():
@@ -135,14 +153,20 @@ def test_hash_content_consistency():
     hash2 = hash_content(content)
     assert hash1 == hash2
     
-    # Empty content has consistent hash
+    # Empty content has consistent hash for the active backend
     empty_hash = hash_content("")
-    assert empty_hash == "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+    if utils.blake3 is not None:
+        assert empty_hash == "af1349b9f5f9a1a6a0404dea36dcc9499bcb25c9adc112b7cc9a93cae41f3262"
+    else:
+        assert empty_hash == "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+    
+    # str and its UTF-8 bytes hash the same
+    assert hash_content(content.encode("utf-8")) == hash1
     
     # Unicode content
     unicode_content = "Hello 世界 🌍"
     unicode_hash = hash_content(unicode_content)
-    assert len(unicode_hash) == 64  # SHA256 produces 64 hex chars
+    assert len(unicode_hash) == 64  # SHA256 and BLAKE3 produce 64 hex chars
     
     # Large content
     large_content = "x" * 1_000_000
@@ -181,4 +205,38 @@ def test_path_edge_cases():
     
     # Paths with special characters
     assert detect_language_from_file("/path/to/file-name_test.go") == "go"
-    assert detect_language_from_file("/path/to/file@2.0.ts") == "typescript"
\ No newline at end of file
+    assert detect_language_from_file("/path/to/file@2.0.ts") == "typescript"
+
+
+def test_json_round_trip():
+    """Test JSON helpers encode to bytes and decode bytes."""
+    data = {"language": "python", "ast": "module\n  identifier: 'héllo'", "count": 3}
+    
+    encoded = json_dumps(data)
+    assert isinstance(encoded, bytes)
+    assert json_loads(encoded) == data
+    
+    pretty = json_dumps(data, indent=True)
+    assert b'\n  "language"' in pretty
+    assert json_loads(pretty) == data
+
+
+def test_json_loads_invalid():
+    """Test invalid JSON raises a json.JSONDecodeError-compatible error."""
+    with pytest.raises(json.JSONDecodeError):
+        json_loads(b"{not json")
+
+
+def test_run_async_without_uvloop():
+    """Test run_async falls back to asyncio.run when uvloop is unavailable."""
+    async def answer():
+        return 42
+    
+    with patch.object(utils, "uvloop", None):
+        assert utils.run_async(answer()) == 42
+        
+        loop = utils.new_event_loop()
+        try:
+            assert loop.run_until_complete(answer()) == 42
+        finally:
+            loop.close()